@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import math
+import random
+import statistics
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import typer
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+from .evaluation import EvalSample, evaluate_sample, load_samples
+from .pipeline import PipelineConfig, build_pipeline
+from .query_processor import QueryProcessor
+from .retrieval import HybridRetriever
+
+console = Console()
+app = typer.Typer(add_completion=False, no_args_is_help=True)
+
+_CONFIG_FIELDS = {item.name for item in fields(PipelineConfig)}
+
+
+@dataclass
+class TrialResult:
+    name: str
+    config: PipelineConfig
+    coverage: float
+    latency_ms: float
+    questions: int
+    repeats: int
+
+
+def load_space(path: str | Path) -> tuple[Dict[str, List[Any]], Dict[str, Any]]:
+    raw = yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+    space = raw.get("space", {})
+    unknown = set(space) - _CONFIG_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown pipeline knobs in search space: {sorted(unknown)}")
+    return space, raw.get("search", {})
+
+
+def sample_configs(
+    space: Dict[str, List[Any]], samples: int, seed: int
+) -> List[PipelineConfig]:
+    """Random configs from the grid, always including the defaults first."""
+    rng = random.Random(seed)
+    configs = [PipelineConfig()]
+    seen = {tuple(sorted(asdict(configs[0]).items()))}
+    attempts = 0
+    while len(configs) < samples and attempts < samples * 20:
+        attempts += 1
+        values = {knob: rng.choice(choices) for knob, choices in space.items()}
+        if "retrieval_weight" in values and "rerank_weight" not in space:
+            values["rerank_weight"] = round(1 - values["retrieval_weight"], 4)
+        config = PipelineConfig(**values)
+        config.rerank_top_k = min(config.rerank_top_k, config.top_k)
+        config.overlap = min(config.overlap, config.chunk_size - 1)
+        key = tuple(sorted(asdict(config).items()))
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def dominates(a: TrialResult, b: TrialResult) -> bool:
+    no_worse = a.coverage >= b.coverage and a.latency_ms <= b.latency_ms
+    better = a.coverage > b.coverage or a.latency_ms < b.latency_ms
+    return no_worse and better
+
+
+def pareto_front(results: Sequence[TrialResult]) -> List[TrialResult]:
+    """Trials no other trial beats on both coverage and latency."""
+    front = [r for r in results if not any(dominates(o, r) for o in results)]
+    return sorted(front, key=lambda r: r.latency_ms)
+
+
+def pareto_ranks(results: Sequence[TrialResult]) -> Dict[str, int]:
+    ranks: Dict[str, int] = {}
+    remaining = list(results)
+    rank = 0
+    while remaining:
+        front = pareto_front(remaining)
+        for result in front:
+            ranks[result.name] = rank
+        names = {result.name for result in front}
+        remaining = [r for r in remaining if r.name not in names]
+        rank += 1
+    return ranks
+
+
+class PipelineCache:
+    """Builds one index per chunking setting and reuses it across trials."""
+
+    def __init__(self, data_path: str) -> None:
+        self.data_path = data_path
+        self._built: Dict[Tuple[int, int], Tuple[HybridRetriever, QueryProcessor]] = {}
+
+    def get(self, config: PipelineConfig) -> Tuple[HybridRetriever, QueryProcessor]:
+        key = (config.chunk_size, config.overlap)
+        if key not in self._built:
+            self._built[key] = build_pipeline(self.data_path, config=config)
+        return self._built[key]
+
+
+def measure(
+    name: str,
+    config: PipelineConfig,
+    samples: Sequence[EvalSample],
+    cache: PipelineCache,
+    repeats: int,
+) -> TrialResult:
+    """Keyword coverage plus median per-query latency over ``repeats`` runs."""
+    retriever, processor = cache.get(config)
+    coverages: List[float] = []
+    latencies: List[float] = []
+    for sample in samples:
+        for repeat in range(repeats):
+            started = time.perf_counter()
+            result = evaluate_sample(
+                sample,
+                data_path=cache.data_path,
+                retriever=retriever,
+                processor=processor,
+                config=config,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            if repeat == 0:
+                coverages.append(result.coverage)
+    return TrialResult(
+        name=name,
+        config=config,
+        coverage=sum(coverages) / len(coverages) if coverages else 0.0,
+        latency_ms=statistics.median(latencies) if latencies else 0.0,
+        questions=len(samples),
+        repeats=repeats,
+    )
+
+
+def successive_halving(
+    configs: Sequence[PipelineConfig],
+    samples: Sequence[EvalSample],
+    cache: PipelineCache,
+    eta: int = 3,
+    rungs: int = 3,
+) -> List[TrialResult]:
+    """Evaluate on a growing slice of questions and repeats, keeping 1/eta.
+
+    Survivors are ranked by Pareto front (coverage vs. latency), breaking ties
+    by coverage; the whole current front always survives, so both cheap and
+    accurate configs reach the last rung.
+    """
+    candidates = [(f"trial-{idx}", config) for idx, config in enumerate(configs)]
+    results: List[TrialResult] = []
+    for rung in range(rungs):
+        share = eta ** (rung - rungs + 1)
+        subset = samples[: max(1, math.ceil(len(samples) * share))]
+        repeats = eta**rung
+        results = [
+            measure(name, config, subset, cache, repeats)
+            for name, config in candidates
+        ]
+        if rung == rungs - 1:
+            break
+        ranks = pareto_ranks(results)
+        results.sort(key=lambda r: (ranks[r.name], -r.coverage, r.latency_ms))
+        front_size = sum(1 for r in results if ranks[r.name] == 0)
+        keep = max(front_size, math.ceil(len(results) / eta))
+        candidates = [(r.name, r.config) for r in results[:keep]]
+    return results
+
+
+def choose(
+    front: Sequence[TrialResult], max_latency_ms: Optional[float]
+) -> TrialResult:
+    """Highest coverage within the latency target, else the fastest trial."""
+    eligible = [
+        r for r in front if max_latency_ms is None or r.latency_ms <= max_latency_ms
+    ]
+    if not eligible:
+        return min(front, key=lambda r: r.latency_ms)
+    return max(eligible, key=lambda r: (r.coverage, -r.latency_ms))
+
+
+def export_yaml(
+    front: Sequence[TrialResult],
+    chosen: TrialResult,
+    queries: Sequence[str],
+    path: str | Path,
+) -> None:
+    """Write the frontier in a layout ``refrag_tuning`` and ``reranker_eval`` read."""
+    payload = {
+        "queries": list(queries),
+        "chosen": {"name": chosen.name, **asdict(chosen.config)},
+        "frontier": [
+            {
+                "name": r.name,
+                "coverage": round(r.coverage, 4),
+                "latency_ms": round(r.latency_ms, 3),
+                **asdict(r.config),
+            }
+            for r in front
+        ],
+        "selectors": [
+            {
+                "name": r.name,
+                "micro_chunk_size": r.config.micro_size,
+                "retain_ratio": r.config.retain_ratio,
+            }
+            for r in front
+        ],
+        "reranker_settings": [
+            {
+                "name": r.name,
+                "retrieval_weight": r.config.retrieval_weight,
+                "rerank_weight": r.config.rerank_weight,
+                "top_k": r.config.rerank_top_k,
+            }
+            for r in front
+        ],
+    }
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(yaml.safe_dump(payload, sort_keys=False), encoding="utf-8")
+
+
+@app.command()
+def autotune(
+    config_path: str = typer.Option(
+        "configs/autotune.yaml", help="Path to the search space YAML."
+    ),
+    questions_path: str = typer.Option(
+        "data/eval_questions.json", help="Path to evaluation questions JSON."
+    ),
+    data_path: str = typer.Option(
+        "data/knowledge_base.json", help="Path to the knowledge base JSON."
+    ),
+    output_path: str = typer.Option(
+        "configs/autotuned.yaml", help="Where to write the frontier and chosen config."
+    ),
+    max_latency_ms: Optional[float] = typer.Option(
+        None, help="Latency target used to pick the chosen config."
+    ),
+) -> None:
+    space, search = load_space(config_path)
+    samples = load_samples(questions_path)
+    configs = sample_configs(
+        space, samples=int(search.get("samples", 27)), seed=int(search.get("seed", 7))
+    )
+    results = successive_halving(
+        configs,
+        samples,
+        PipelineCache(data_path),
+        eta=int(search.get("eta", 3)),
+        rungs=int(search.get("rungs", 3)),
+    )
+    front = pareto_front(results)
+    chosen = choose(front, max_latency_ms)
+
+    table = Table(title="Latency / Quality Pareto Frontier", show_lines=True)
+    table.add_column("Trial", style="cyan")
+    table.add_column("Coverage", justify="right")
+    table.add_column("Latency (ms)", justify="right")
+    table.add_column("Top-k", justify="right")
+    table.add_column("Rerank k", justify="right")
+    table.add_column("Weights", justify="right")
+    table.add_column("Micro / Retain", justify="right")
+    table.add_column("Chunk / Overlap", justify="right")
+    for result in front:
+        cfg = result.config
+        marker = " *" if result is chosen else ""
+        table.add_row(
+            f"{result.name}{marker}",
+            f"{result.coverage * 100:.0f}%",
+            f"{result.latency_ms:.2f}",
+            str(cfg.top_k),
+            str(cfg.rerank_top_k),
+            f"{cfg.retrieval_weight:.2f}/{cfg.rerank_weight:.2f}",
+            f"{cfg.micro_size}/{cfg.retain_ratio:.2f}",
+            f"{cfg.chunk_size}/{cfg.overlap}",
+        )
+    console.print(table)
+
+    export_yaml(front, chosen, [sample.question for sample in samples], output_path)
+    console.print(f"[green]Saved frontier and chosen config to {output_path}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from .data_loader import load_documents
+from .indexing import SemanticChunker
+from .models import Document, DocumentChunk
+
+console = Console()
+app = typer.Typer(add_completion=False, no_args_is_help=True)
+
+
+def split_join_chunks(
+    documents: List[Document], chunk_size: int = 80, overlap: int = 20
+) -> List[DocumentChunk]:
+    """Reference ``str.split``/``" ".join`` sliding-window chunker."""
+    chunks: List[DocumentChunk] = []
+    step = max(1, chunk_size - overlap)
+    for document in documents:
+        tokens = document.content.split()
+        for number, idx in enumerate(range(0, len(tokens), step)):
+            chunks.append(
+                DocumentChunk(
+                    chunk_id=f"{document.id}-chunk-{number}",
+                    document_id=document.id,
+                    text=" ".join(tokens[idx : idx + chunk_size]),
+                    metadata={**document.metadata, "source_title": document.title},
+                )
+            )
+    return chunks
+
+
+def synthetic_corpus(
+    data_path: str, documents: int, document_chars: int, seed: int = 7
+) -> List[Document]:
+    """Documents of about ``document_chars`` built from knowledge base sentences."""
+    sentences = [
+        sentence
+        for document in load_documents(data_path)
+        for sentence in re.split(r"(?<=[.!?])\s+", document.content)
+        if sentence
+    ]
+    rng = random.Random(seed)
+    corpus = []
+    for idx in range(documents):
+        parts: List[str] = []
+        size = 0
+        while size < document_chars:
+            parts.append(rng.choice(sentences))
+            size += len(parts[-1]) + 1
+        content = " ".join(parts)
+        corpus.append(Document(id=f"doc-{idx}", title=f"Doc {idx}", content=content))
+    return corpus
+
+
+def best_of(run: Callable[[], list], repeats: int) -> tuple[float, int]:
+    """Fastest wall time in milliseconds over ``repeats`` runs, and result size."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        size = len(run())
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, size
+
+
+@app.command()
+def benchmark(
+    data_path: str = typer.Option(
+        "data/knowledge_base.json", help="Knowledge base the sentences are drawn from."
+    ),
+    documents: int = typer.Option(2000, help="Documents in the many-small corpus."),
+    document_chars: int = typer.Option(
+        2000, help="Approximate characters per document."
+    ),
+    repeats: int = typer.Option(5, help="Runs per chunker; the fastest is reported."),
+    output_path: str = typer.Option(
+        "reports/chunk_benchmark.json", help="Optional JSON log for the benchmark."
+    ),
+) -> None:
+    small = synthetic_corpus(data_path, documents, document_chars)
+    large = [
+        Document(
+            id="single", title="Single", content=" ".join(d.content for d in small)
+        )
+    ]
+    chunker = SemanticChunker()
+    results = []
+    for corpus_name, corpus in (("many small", small), ("one large", large)):
+        megabytes = sum(len(document.content) for document in corpus) / 1e6
+        baseline_ms, baseline_chunks = best_of(
+            lambda: split_join_chunks(corpus), repeats
+        )
+        offsets_ms, offsets_chunks = best_of(
+            lambda: list(chunker.chunk_documents(corpus)), repeats
+        )
+        for name, elapsed, chunks in (
+            ("split/join", baseline_ms, baseline_chunks),
+            ("offsets", offsets_ms, offsets_chunks),
+        ):
+            results.append(
+                {
+                    "corpus": corpus_name,
+                    "chunker": name,
+                    "chunks": chunks,
+                    "ms": elapsed,
+                    "mb_per_s": megabytes / (elapsed / 1000),
+                    "speedup": baseline_ms / elapsed,
+                }
+            )
+
+    table = Table(title="Chunker Throughput Benchmark", show_lines=True)
+    table.add_column("Corpus", style="cyan")
+    table.add_column("Chunker")
+    table.add_column("Chunks", justify="right")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("MB/s", justify="right")
+    table.add_column("Speedup", justify="right")
+    for row in results:
+        table.add_row(
+            row["corpus"],
+            row["chunker"],
+            f"{row['chunks']:,}",
+            f"{row['ms']:.1f}",
+            f"{row['mb_per_s']:.0f}",
+            f"{row['speedup']:.2f}x",
+        )
+    console.print(table)
+
+    if output_path:
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        console.print(f"[green]Saved benchmark metrics to {output_file}")
+
+
+if __name__ == "__main__":
+    app()
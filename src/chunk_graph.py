@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+
+from .models import DocumentChunk
+
+
+@dataclass
+class ChunkGraph:
+    """Sparse chunk-to-chunk graph stored as CSR arrays over index rows."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+
+    @property
+    def rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def neighbours(self, row: int) -> List[tuple[int, float]]:
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        return list(
+            zip(self.indices[start:stop].tolist(), self.weights[start:stop].tolist())
+        )
+
+    def save(self, path: str | Path) -> None:
+        np.savez(
+            Path(path), indptr=self.indptr, indices=self.indices, weights=self.weights
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ChunkGraph":
+        with np.load(Path(path)) as data:
+            return cls(
+                indptr=data["indptr"], indices=data["indices"], weights=data["weights"]
+            )
+
+
+def _knn_edges(matrix, k: int, block_size: int) -> coo_matrix:
+    """Top-``k`` cosine neighbours per row, one block of rows at a time."""
+    n_rows = matrix.shape[0]
+    k = min(k, n_rows - 1)
+    if k <= 0:
+        return coo_matrix((n_rows, n_rows), dtype=np.float32)
+    rows: List[np.ndarray] = []
+    cols: List[np.ndarray] = []
+    vals: List[np.ndarray] = []
+    transposed = matrix.T.tocsc()
+    for start in range(0, n_rows, block_size):
+        stop = min(start + block_size, n_rows)
+        sims = np.asarray((matrix[start:stop] @ transposed).todense(), dtype=np.float32)
+        local = np.arange(stop - start)
+        sims[local, start + local] = -np.inf
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        keep = top_sims > 0
+        rows.append(np.repeat(start + local, k)[keep.ravel()])
+        cols.append(top[keep])
+        vals.append(top_sims[keep])
+    return coo_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n_rows, n_rows),
+    )
+
+
+def _adjacency_edges(chunks: Sequence[DocumentChunk], weight: float) -> coo_matrix:
+    """Link consecutive chunks of the same document in both directions."""
+    n_rows = len(chunks)
+    left = [
+        row
+        for row in range(n_rows - 1)
+        if chunks[row].document_id == chunks[row + 1].document_id
+    ]
+    src = np.asarray(left + [row + 1 for row in left], dtype=np.int64)
+    dst = np.asarray([row + 1 for row in left] + left, dtype=np.int64)
+    vals = np.full(len(src), weight, dtype=np.float32)
+    return coo_matrix((vals, (src, dst)), shape=(n_rows, n_rows))
+
+
+def build_chunk_graph(
+    matrix,
+    chunks: Sequence[DocumentChunk],
+    k: int = 5,
+    block_size: int = 256,
+    adjacency_weight: float = 0.5,
+) -> ChunkGraph:
+    """Build the kNN + same-document adjacency graph over L2-normalised rows."""
+    knn = csr_matrix(_knn_edges(matrix, k, block_size))
+    adjacency = csr_matrix(_adjacency_edges(chunks, adjacency_weight))
+    graph = knn.maximum(adjacency).tocsr()
+    graph.sort_indices()
+    return ChunkGraph(
+        indptr=graph.indptr.astype(np.int32),
+        indices=graph.indices.astype(np.int32),
+        weights=graph.data.astype(np.float32),
+    )
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+# Per-unit stage costs (ms) used until real timings have been observed.
+DEFAULT_STAGE_COSTS: Dict[str, float] = {
+    "retrieve": 2.0,  # per query rewrite
+    "rerank": 0.5,  # per candidate
+    "refrag": 0.2,  # per chunk
+    "generate": 0.2,  # per request
+}
+
+
+@dataclass
+class StageCostModel:
+    """EWMA of observed per-unit stage latencies, shared across requests."""
+
+    alpha: float = 0.2
+    costs: Dict[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_STAGE_COSTS)
+    )
+
+    def observe(self, stage: str, elapsed_ms: float, units: int = 1) -> None:
+        per_unit = elapsed_ms / max(1, units)
+        previous = self.costs.get(stage)
+        if previous is None:
+            self.costs[stage] = per_unit
+        else:
+            self.costs[stage] = (1 - self.alpha) * previous + self.alpha * per_unit
+
+    def expected(self, stage: str, units: int = 1) -> float:
+        return self.costs.get(stage, 0.0) * units
+
+
+class Deadline:
+    """Per-request latency budget that plans stage degradations.
+
+    Each ``plan_*`` call compares the remaining budget, minus a reserve for the
+    stages that must still run, against the cost model's estimate and records
+    any degradation it applies in ``degradations``.
+    """
+
+    def __init__(
+        self,
+        budget_ms: float,
+        costs: Optional[StageCostModel] = None,
+        started: Optional[float] = None,
+    ) -> None:
+        self.budget_ms = budget_ms
+        self.costs = costs if costs is not None else StageCostModel()
+        self.started = time.perf_counter() if started is None else started
+        self.degradations: List[str] = []
+
+    @classmethod
+    def unbounded(cls) -> "Deadline":
+        return cls(budget_ms=math.inf)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @property
+    def remaining_ms(self) -> float:
+        return self.budget_ms - self.elapsed_ms
+
+    def _available(self, *reserved_stages: tuple[str, int]) -> float:
+        reserve = sum(
+            self.costs.expected(stage, units) for stage, units in reserved_stages
+        )
+        return self.remaining_ms - reserve
+
+    @contextmanager
+    def stage(self, name: str, units: int = 1) -> Iterator[None]:
+        started = time.perf_counter()
+        yield
+        if units:
+            self.costs.observe(name, (time.perf_counter() - started) * 1000, units)
+
+    def plan_rewrites(self, rewrites: int, chunks: int) -> int:
+        available = self._available(("refrag", chunks), ("generate", 1))
+        per_rewrite = self.costs.expected("retrieve")
+        if per_rewrite <= 0 or available >= per_rewrite * rewrites:
+            return rewrites
+        allowed = max(1, min(rewrites, int(available // per_rewrite)))
+        self.degradations.append(f"rewrites:{rewrites}->{allowed}")
+        return allowed
+
+    def plan_pool(self, top_k: int, reduced: int, rewrites: int, chunks: int) -> int:
+        """Candidate pool size; each candidate is a unit of reranking later."""
+        available = self._available(
+            ("retrieve", rewrites), ("refrag", chunks), ("generate", 1)
+        )
+        per_candidate = self.costs.expected("rerank")
+        if per_candidate <= 0 or available >= per_candidate * top_k:
+            return top_k
+        allowed = max(reduced, min(top_k, int(available // per_candidate)))
+        if allowed >= top_k:
+            return top_k
+        self.degradations.append(f"candidates:{top_k}->{allowed}")
+        return allowed
+
+    def plan_rerank(self, candidates: int, keep: int, chunks: int) -> int:
+        """How many candidates to rerank; ``0`` skips the reranker."""
+        available = self._available(("refrag", chunks), ("generate", 1))
+        if available >= self.costs.expected("rerank", candidates):
+            return candidates
+        if candidates > keep and available >= self.costs.expected("rerank", keep):
+            self.degradations.append(f"rerank:{candidates}->{keep}")
+            return keep
+        self.degradations.append("rerank:skipped")
+        return 0
+
+    def plan_retain_ratio(self, retain_ratio: float, tight_ratio: float) -> float:
+        if self.remaining_ms >= self.budget_ms / 4 or tight_ratio >= retain_ratio:
+            return retain_ratio
+        self.degradations.append(f"refrag_retain:{retain_ratio}->{tight_ratio}")
+        return tight_ratio
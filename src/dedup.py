@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .models import DocumentChunk
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+@dataclass
+class DuplicateGroups:
+    """Near-duplicate clusters keyed by the representative chunk id."""
+
+    representatives: List[DocumentChunk]
+    members: Dict[str, List[DocumentChunk]] = field(default_factory=dict)
+
+    def group_of(self) -> Dict[str, str]:
+        return {
+            member.chunk_id: rep_id
+            for rep_id, members in self.members.items()
+            for member in members
+        }
+
+
+def _shingles(text: str, size: int) -> np.ndarray:
+    tokens = text.lower().split()
+    if len(tokens) <= size:
+        grams = [" ".join(tokens)]
+    else:
+        grams = [" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)]
+    return np.fromiter(
+        (zlib.crc32(gram.encode("utf-8")) for gram in set(grams)),
+        dtype=np.uint64,
+    )
+
+
+class NearDuplicateDetector:
+    """MinHash/LSH grouping of chunks whose shingle sets nearly coincide."""
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        threshold: float = 0.8,
+        seed: int = 13,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, chunks: Sequence[DocumentChunk]) -> np.ndarray:
+        signatures = np.empty((len(chunks), self.num_perm), dtype=np.uint64)
+        for row, chunk in enumerate(chunks):
+            hashes = _shingles(chunk.text, self.shingle_size) % _MERSENNE_PRIME
+            permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+            signatures[row] = permuted.min(axis=0)
+        return signatures
+
+    def group(self, chunks: Sequence[DocumentChunk]) -> DuplicateGroups:
+        chunks = list(chunks)
+        if not chunks:
+            return DuplicateGroups(representatives=[])
+        signatures = self.signatures(chunks)
+        parent = list(range(len(chunks)))
+
+        def find(idx: int) -> int:
+            while parent[idx] != idx:
+                parent[idx] = parent[parent[idx]]
+                idx = parent[idx]
+            return idx
+
+        rows = self.num_perm // self.bands
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = {}
+            band_slice = signatures[:, band * rows : (band + 1) * rows]
+            for idx, key in enumerate(band_slice):
+                buckets.setdefault(key.tobytes(), []).append(idx)
+            # Members are checked against the bucket's first chunk only, so a
+            # popular bucket costs one comparison per member, not per pair.
+            for first, *others in buckets.values():
+                for second in others:
+                    root_a, root_b = find(first), find(second)
+                    if root_a == root_b:
+                        continue
+                    similarity = np.mean(signatures[first] == signatures[second])
+                    if similarity >= self.threshold:
+                        # Keep the earliest chunk as the group representative.
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        representatives: List[DocumentChunk] = []
+        members: Dict[str, List[DocumentChunk]] = {}
+        for idx, chunk in enumerate(chunks):
+            root = chunks[find(idx)]
+            if root.chunk_id not in members:
+                representatives.append(root)
+                members[root.chunk_id] = []
+            members[root.chunk_id].append(chunk)
+        return DuplicateGroups(representatives=representatives, members=members)
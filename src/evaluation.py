@@ -9,7 +9,7 @@ import typer
 from rich.console import Console
 from rich.table import Table
 
-from .pipeline import PipelineArtifacts, build_pipeline, run_pipeline
+from .pipeline import PipelineArtifacts, PipelineConfig, build_pipeline, run_pipeline
 
 console = Console()
 app = typer.Typer(add_completion=False, no_args_is_help=True)
@@ -54,12 +54,14 @@ def evaluate_sample(
     data_path: str,
     retriever=None,
     processor=None,
+    config: PipelineConfig | None = None,
 ) -> EvalResult:
     artifacts: PipelineArtifacts = run_pipeline(
         query=sample.question,
         data_path=data_path,
         retriever=retriever,
         processor=processor,
+        config=config,
     )
     context_text = "\n".join(chunk.text for chunk in artifacts.chunks)
     combined_text = (
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Protocol, Sequence
+
+import numpy as np
+
+from .indexing import HybridIndexer
+from .metadata_index import Predicate
+from .query_processor import QueryBundle
+from .retrieval import HybridRetriever, RetrievalResult, diversify_by_group
+
+
+class FirstStageRetriever(Protocol):
+    def search(
+        self, bundle: QueryBundle, top_k: int, rows: Optional[np.ndarray] = None
+    ) -> List[tuple[int, float]]: ...
+
+
+@dataclass
+class FusionOutcome:
+    results: List[RetrievalResult]
+    dropped: List[str] = field(default_factory=list)
+    latencies: Dict[str, float] = field(default_factory=dict)
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[tuple[int, float]]],
+    weights: Dict[str, float],
+    k: int = 60,
+) -> Dict[int, float]:
+    fused: Dict[int, float] = {}
+    for name, ranked in rankings.items():
+        weight = weights.get(name, 1.0)
+        for rank, (row, _) in enumerate(ranked, start=1):
+            fused[row] = fused.get(row, 0.0) + weight / (k + rank)
+    return fused
+
+
+def weighted_score_fusion(
+    rankings: Dict[str, List[tuple[int, float]]],
+    weights: Dict[str, float],
+) -> Dict[int, float]:
+    """Min-max normalise each retriever's scores, then blend by weight."""
+    fused: Dict[int, float] = {}
+    for name, ranked in rankings.items():
+        if not ranked:
+            continue
+        weight = weights.get(name, 1.0)
+        scores = [score for _, score in ranked]
+        low, high = min(scores), max(scores)
+        span = high - low
+        for row, score in ranked:
+            normalised = (score - low) / span if span else 1.0
+            fused[row] = fused.get(row, 0.0) + weight * normalised
+    return fused
+
+
+class FusionRetriever:
+    """Runs first-stage retrievers concurrently and fuses their rankings.
+
+    Each retriever runs on its own small thread pool (the sparse products
+    release the GIL), so a stalled backend can only tie up its own workers. A
+    retriever that misses its timeout (``default_timeout`` when none is given)
+    or raises is dropped from the fusion for that request. Calls that timed out
+    but are still running are tracked as abandoned; once they hold every worker
+    of a retriever, it is dropped without being queued until one finishes.
+    """
+
+    def __init__(
+        self,
+        indexer: HybridIndexer,
+        retrievers: Dict[str, FirstStageRetriever],
+        method: str = "rrf",
+        weights: Optional[Dict[str, float]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        rrf_k: int = 60,
+        default_timeout: float = 5.0,
+        workers_per_retriever: int = 4,
+    ) -> None:
+        if method not in ("rrf", "weighted"):
+            raise ValueError(f"Unknown fusion method: {method!r}")
+        self.indexer = indexer
+        self.retrievers = dict(retrievers)
+        self.method = method
+        self.weights = weights or {}
+        self.timeouts = timeouts or {}
+        self.rrf_k = rrf_k
+        self.default_timeout = default_timeout
+        self.workers_per_retriever = workers_per_retriever
+        self._pools = {
+            name: ThreadPoolExecutor(
+                max_workers=workers_per_retriever,
+                thread_name_prefix=f"fusion-{name}",
+            )
+            for name in self.retrievers
+        }
+        self._abandoned = {name: 0 for name in self.retrievers}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_hybrid(cls, retriever: HybridRetriever, **kwargs) -> "FusionRetriever":
+        retrievers = {"tfidf": retriever.tfidf, "lexical": retriever.lexical}
+        return cls(retriever.indexer, retrievers, **kwargs)
+
+    def close(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
+
+    def _submit(self, name: str, *args) -> Optional[Future]:
+        """Queue on ``name``'s pool, or return ``None`` if it is all abandoned."""
+        with self._lock:
+            if self._abandoned[name] >= self.workers_per_retriever:
+                return None
+        return self._pools[name].submit(self._timed, self.retrievers[name], *args)
+
+    def _abandon(self, name: str, future: Future) -> None:
+        if future.cancel():
+            return
+        with self._lock:
+            self._abandoned[name] += 1
+        future.add_done_callback(lambda _: self._release(name))
+
+    def _release(self, name: str) -> None:
+        with self._lock:
+            self._abandoned[name] -= 1
+
+    def fuse(
+        self,
+        bundle: QueryBundle,
+        top_k: int = 6,
+        diversify: bool = False,
+        filters: Sequence[Predicate] = (),
+    ) -> FusionOutcome:
+        rows = self.indexer.select_rows(filters) if filters else None
+        pool = top_k * 4 if diversify else top_k * 2
+        started = time.perf_counter()
+        futures = {
+            name: self._submit(name, bundle, pool, rows) for name in self.retrievers
+        }
+        rankings: Dict[str, List[tuple[int, float]]] = {}
+        outcome = FusionOutcome(results=[])
+        for name, future in futures.items():
+            if future is None:
+                outcome.dropped.append(name)
+                continue
+            timeout = self.timeouts.get(name, self.default_timeout)
+            remaining = max(0.0, timeout - (time.perf_counter() - started))
+            try:
+                rankings[name], outcome.latencies[name] = future.result(remaining)
+            except TimeoutError:
+                self._abandon(name, future)
+                outcome.dropped.append(name)
+            except Exception:  # a failing backend must not sink the request
+                outcome.dropped.append(name)
+
+        if self.method == "rrf":
+            fused = reciprocal_rank_fusion(rankings, self.weights, k=self.rrf_k)
+        else:
+            fused = weighted_score_fusion(rankings, self.weights)
+        ranked = sorted(fused.items())
+        ranked.sort(key=lambda pair: pair[1], reverse=True)
+        results = [
+            RetrievalResult(chunk=self.indexer.chunks[row], score=score)
+            for row, score in ranked
+        ]
+        if diversify:
+            results = diversify_by_group(results, self.indexer.group_ids)
+        outcome.results = results[:top_k]
+        return outcome
+
+    def retrieve(
+        self,
+        bundle: QueryBundle,
+        top_k: int = 6,
+        diversify: bool = False,
+        filters: Sequence[Predicate] = (),
+    ) -> List[RetrievalResult]:
+        outcome = self.fuse(bundle, top_k=top_k, diversify=diversify, filters=filters)
+        return outcome.results
+
+    @staticmethod
+    def _timed(
+        retriever: FirstStageRetriever,
+        bundle: QueryBundle,
+        top_k: int,
+        rows: Optional[np.ndarray],
+    ) -> tuple[List[tuple[int, float]], float]:
+        started = time.perf_counter()
+        ranked = retriever.search(bundle, top_k=top_k, rows=rows)
+        return ranked, time.perf_counter() - started
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import typer
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+from .evaluation import evaluate_sample, load_samples
+from .indexing import IndexBudget, matrix_nbytes, vocabulary_nbytes
+from .pipeline import build_pipeline
+from .retrieval import HybridRetriever
+
+console = Console()
+app = typer.Typer(add_completion=False, no_args_is_help=True)
+
+
+@dataclass
+class BudgetSetting:
+    name: str
+    budget: IndexBudget
+
+
+def load_config(path: str | Path) -> List[BudgetSetting]:
+    raw = yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+    return [
+        BudgetSetting(
+            name=item["name"],
+            budget=IndexBudget(
+                max_bytes=item.get("max_bytes"),
+                max_features=item.get("max_features"),
+                prune_epsilon=float(item.get("prune_epsilon", 0.0)),
+            ),
+        )
+        for item in raw.get("budgets", [])
+    ]
+
+
+def index_nbytes(retriever: HybridRetriever) -> int:
+    """Bytes held by the TF-IDF and lexical scorers behind a retriever.
+
+    Counts the posting arrays plus each fitted vocabulary and idf vector.
+    """
+    total = retriever.indexer.memory_report.total_bytes
+    lexical = retriever.lexical
+    if lexical.vectorizer is not None:
+        # The default mode fits a separate lexical matrix and vocabulary.
+        total += matrix_nbytes(lexical.matrix)
+        total += vocabulary_nbytes(lexical.vectorizer.vocabulary_)
+    return total
+
+
+def measure(
+    name: str,
+    retriever: HybridRetriever,
+    processor,
+    questions_path: str,
+    data_path: str,
+    reference: Optional[Dict[str, List[str]]] = None,
+) -> tuple[dict, Dict[str, List[str]]]:
+    samples = load_samples(questions_path)
+    coverages = []
+    overlaps = []
+    ranked_ids: Dict[str, List[str]] = {}
+    for sample in samples:
+        result = evaluate_sample(
+            sample, data_path=data_path, retriever=retriever, processor=processor
+        )
+        coverages.append(result.coverage)
+        bundle = processor.process(sample.question)
+        ids = [item.chunk.chunk_id for item in retriever.retrieve(bundle)]
+        ranked_ids[sample.question] = ids
+        if reference is not None:
+            expected = set(reference[sample.question])
+            overlap = len(expected & set(ids)) / len(expected) if expected else 1.0
+            overlaps.append(overlap)
+    row = {
+        "setting": name,
+        "bytes": index_nbytes(retriever),
+        "coverage": sum(coverages) / len(coverages) if coverages else 0.0,
+        "overlap": sum(overlaps) / len(overlaps) if overlaps else 1.0,
+    }
+    return row, ranked_ids
+
+
+@app.command()
+def benchmark(
+    config_path: str = typer.Option(
+        "configs/index_budget.yaml", help="Path to the index budget config."
+    ),
+    questions_path: str = typer.Option(
+        "data/eval_questions.json", help="Path to evaluation questions JSON."
+    ),
+    data_path: str = typer.Option(
+        "data/knowledge_base.json", help="Path to the knowledge base JSON."
+    ),
+    output_path: str = typer.Option(
+        "reports/index_budget.json", help="Optional JSON log for the benchmark."
+    ),
+) -> None:
+    settings = load_config(config_path)
+    retriever, processor = build_pipeline(data_path)
+    baseline, reference = measure(
+        "default", retriever, processor, questions_path, data_path
+    )
+    results = [baseline]
+    for setting in settings:
+        retriever, processor = build_pipeline(data_path, budget=setting.budget)
+        row, _ = measure(
+            setting.name, retriever, processor, questions_path, data_path, reference
+        )
+        results.append(row)
+
+    table = Table(title="Index Memory Budget Benchmark", show_lines=True)
+    table.add_column("Setting", style="cyan")
+    table.add_column("Bytes", justify="right")
+    table.add_column("Bytes Saved", justify="right")
+    table.add_column("Coverage", justify="right")
+    table.add_column("Coverage Loss", justify="right")
+    table.add_column("Top-k Overlap", justify="right")
+    for row in results:
+        row["bytes_saved"] = baseline["bytes"] - row["bytes"]
+        row["coverage_loss"] = baseline["coverage"] - row["coverage"]
+        table.add_row(
+            row["setting"],
+            f"{row['bytes']:,}",
+            f"{row['bytes_saved'] / baseline['bytes'] * 100:.0f}%",
+            f"{row['coverage'] * 100:.0f}%",
+            f"{row['coverage_loss'] * 100:.1f}%",
+            f"{row['overlap'] * 100:.0f}%",
+        )
+    console.print(table)
+
+    if output_path:
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        console.print(f"[green]Saved benchmark metrics to {output_file}")
+
+
+if __name__ == "__main__":
+    app()
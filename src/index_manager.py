@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import functools
+import itertools
+import pickle
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .pipeline import PipelineArtifacts, run_pipeline
+from .query_processor import QueryProcessor
+from .retrieval import HybridRetriever
+
+Builder = Callable[[], Tuple[HybridRetriever, QueryProcessor]]
+
+
+@dataclass
+class IndexVersion:
+    """A read-only retriever/processor pair tagged with a version id."""
+
+    version_id: str
+    retriever: Optional[HybridRetriever]
+    processor: Optional[QueryProcessor]
+    built_at: float = field(default_factory=time.time)
+    in_flight: int = 0
+    retired: bool = False
+
+    @property
+    def released(self) -> bool:
+        return self.retriever is None
+
+
+def save_snapshot(
+    retriever: HybridRetriever, processor: QueryProcessor, path: str | Path
+) -> None:
+    """Pickle a built retriever/processor pair (not for text-store chunks)."""
+    Path(path).write_bytes(pickle.dumps((retriever, processor)))
+
+
+def _load_snapshot(path: str | Path) -> Tuple[HybridRetriever, QueryProcessor]:
+    return pickle.loads(Path(path).read_bytes())
+
+
+def snapshot_builder(path: str | Path) -> Builder:
+    """Picklable builder that loads a snapshot written by ``save_snapshot``.
+
+    Being a ``functools.partial`` of a module-level function, it can be
+    submitted to a ``ProcessPoolExecutor``.
+    """
+    return functools.partial(_load_snapshot, path)
+
+
+class IndexManager:
+    """Double-buffered index holder with background rebuilds.
+
+    Queries read ``current`` once and pin it for their duration; a rebuild
+    runs on the executor and is published with a single reference swap, so
+    readers never wait on it. A replaced version is released when its last
+    in-flight query finishes.
+    """
+
+    def __init__(
+        self,
+        builder: Builder,
+        executor: Optional[Executor] = None,
+        on_release: Optional[Callable[[IndexVersion], None]] = None,
+    ) -> None:
+        self.builder = builder
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="index-rebuild"
+        )
+        self._owns_executor = executor is None
+        self._on_release = on_release
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._current: Optional[IndexVersion] = None
+        self._retired: List[IndexVersion] = []
+
+    @property
+    def current(self) -> IndexVersion:
+        version = self._current
+        if version is None:
+            raise RuntimeError("No index version has been published yet.")
+        return version
+
+    @property
+    def version_id(self) -> str:
+        return self.current.version_id
+
+    def load(self, builder: Optional[Builder] = None) -> IndexVersion:
+        """Build synchronously and publish; used for the first version."""
+        retriever, processor = (builder or self.builder)()
+        return self.publish(retriever, processor)
+
+    def rebuild(self, builder: Optional[Builder] = None) -> Future:
+        """Build a new version in the background and swap it in when ready."""
+        build = builder or self.builder
+        outer: Future = Future()
+
+        def finish(future: Future) -> None:
+            try:
+                retriever, processor = future.result()
+                outer.set_result(self.publish(retriever, processor))
+            except BaseException as exc:  # surface build errors to the caller
+                outer.set_exception(exc)
+
+        self._executor.submit(build).add_done_callback(finish)
+        return outer
+
+    def publish(
+        self, retriever: HybridRetriever, processor: QueryProcessor
+    ) -> IndexVersion:
+        version = IndexVersion(
+            version_id=f"v{next(self._counter)}-{uuid.uuid4().hex[:8]}",
+            retriever=retriever,
+            processor=processor,
+        )
+        with self._lock:
+            previous, self._current = self._current, version
+            if previous is not None:
+                previous.retired = True
+                self._retired.append(previous)
+        if previous is not None:
+            self._release_if_drained(previous)
+        return version
+
+    @contextmanager
+    def acquire(self) -> Iterator[IndexVersion]:
+        """Pin the current version for the duration of a query."""
+        with self._lock:
+            version = self.current
+            version.in_flight += 1
+        try:
+            yield version
+        finally:
+            with self._lock:
+                version.in_flight -= 1
+            self._release_if_drained(version)
+
+    def run(self, query: str, **kwargs) -> PipelineArtifacts:
+        with self.acquire() as version:
+            artifacts = run_pipeline(
+                query=query,
+                retriever=version.retriever,
+                processor=version.processor,
+                **kwargs,
+            )
+        artifacts.index_version = version.version_id
+        return artifacts
+
+    def _release_if_drained(self, version: IndexVersion) -> None:
+        with self._lock:
+            if not version.retired or version.in_flight or version.released:
+                return
+            self._retired.remove(version)
+            retriever = version.retriever
+            version.retriever = None
+            version.processor = None
+        close = getattr(retriever, "close", None)
+        if close is not None:
+            close()
+        if self._on_release is not None:
+            self._on_release(version)
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
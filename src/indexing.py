@@ -1,77 +1,543 @@
 from __future__ import annotations
 
+import sys
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
-from typing import Iterable, List, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import (
+    CountVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 
-from .models import Document, DocumentChunk
+from .chunk_graph import ChunkGraph, build_chunk_graph
+from .dedup import DuplicateGroups, NearDuplicateDetector
+from .metadata_index import MetadataIndex, Predicate
+from .models import Document, DocumentChunk, SpanChunk
+from .text_store import TextStore
+
+# Compact mode stores one int32 column index plus a float32 TF-IDF weight and a
+# float32 lexical weight per posting.
+_COMPACT_POSTING_BYTES = 4 + 4 + 4
+_COMPACT_INDPTR_BYTES = 4
+
+
+# Character classes over code points: ``str.isspace`` is false for everything
+# at or above U+3001, so offsets agree with ``str.split()``. The extra final
+# slot (``_OTHER``) stands for every code point beyond the table.
+_TOKEN, _SPACE, _SENTENCE_END, _CLOSER = 0, 1, 2, 3
+_TABLE_SIZE = 0x3001
+_OTHER = _TABLE_SIZE
+_CHAR_CLASS = np.full(_TABLE_SIZE + 1, _TOKEN, dtype=np.uint8)
+_CHAR_CLASS[[c for c in range(_TABLE_SIZE) if chr(c).isspace()]] = _SPACE
+_CHAR_CLASS[[ord(c) for c in ".!?"]] = _SENTENCE_END
+_CHAR_CLASS[[ord(c) for c in "\"')]\u201d\u2019"]] = _CLOSER
+# ``bytes.translate`` table classifying ASCII text without an index array.
+_ASCII_CLASS = _CHAR_CLASS[:256].tobytes()
+
+
+def _char_classes(text: str) -> np.ndarray:
+    if text.isascii():
+        return np.frombuffer(text.encode("ascii").translate(_ASCII_CLASS), np.uint8)
+    # ``surrogatepass`` keeps lone surrogates (which ``json`` can produce) as
+    # one code unit each, so offsets still line up with ``str`` indices.
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    return np.take(_CHAR_CLASS, np.minimum(codes, _OTHER))
+
+
+def token_offsets(text: str) -> tuple[np.ndarray, np.ndarray]:
+    """Character ``(starts, ends)`` of whitespace-delimited tokens in ``text``."""
+    return _token_offsets(_char_classes(text))
+
+
+def _token_offsets(classes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    is_token = np.zeros(len(classes) + 2, dtype=bool)
+    np.not_equal(classes, _SPACE, out=is_token[1:-1])
+    edges = np.flatnonzero(is_token[1:] != is_token[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def _sentence_end_tokens(classes: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Indices of tokens that close a sentence (``.``, ``!`` or ``?``)."""
+    if not len(ends):
+        return ends
+    last = classes[ends - 1]
+    before = classes[np.maximum(ends - 2, 0)]
+    closes = last == _SENTENCE_END
+    closes |= (last == _CLOSER) & (before == _SENTENCE_END)
+    return np.flatnonzero(closes)
+
+
+# ``chunk_documents`` tokenises documents in batches of about this many
+# characters, joined by a newline so no token spans two documents.
+_BATCH_CHARS = 1 << 20
+# Below this many unfinished texts, planning windows one text at a time is
+# cheaper than another lockstep step over the batch.
+_SCALAR_TAIL = 32
 
 
 @dataclass
 class SemanticChunker:
+    """Sentence-aware sliding windows over token offsets.
+
+    Text is tokenised into character offsets, a batch of documents at a time.
+    A window holds at most ``chunk_size`` tokens and is cut back to the last
+    sentence end if that keeps at least half of them. The next window starts
+    up to ``overlap`` tokens before the previous stop, moved forward to the
+    first sentence start in that range. Chunks are ``SpanChunk`` views into
+    the document text.
+    """
+
     chunk_size: int = 80
     overlap: int = 20
 
-    def chunk(self, document: Document) -> List[DocumentChunk]:
-        tokens = document.content.split()
-        chunks: List[DocumentChunk] = []
-        step = max(1, self.chunk_size - self.overlap)
-        for idx in range(0, len(tokens), step):
-            window = tokens[idx : idx + self.chunk_size]
-            if not window:
-                continue
-            chunk_text = " ".join(window)
-            chunk_id = f"{document.id}-chunk-{len(chunks)}"
-            metadata = {**document.metadata, "source_title": document.title}
-            chunks.append(
-                DocumentChunk(
-                    chunk_id=chunk_id,
-                    document_id=document.id,
-                    text=chunk_text,
-                    metadata=metadata,
-                )
+    def spans(self, text: str) -> List[tuple[int, int]]:
+        """Character spans of each chunk window of ``text``."""
+        return self._batch_spans([text])[0]
+
+    def _batch_spans(self, texts: Sequence[str]) -> List[List[tuple[int, int]]]:
+        """Spans for several texts from a single tokenisation pass."""
+        bases = np.zeros(len(texts), dtype=np.int64)
+        np.cumsum([len(text) + 1 for text in texts[:-1]], out=bases[1:])
+        classes = _char_classes("\n".join(texts))
+        starts, ends = _token_offsets(classes)
+        sentence_ends = _sentence_end_tokens(classes, ends)
+        begins = np.searchsorted(starts, bases)
+        limits = np.append(begins[1:], len(starts))
+        owners, firsts, stops = self._plan_windows(begins, limits, sentence_ends)
+        # Token windows become character spans in one gather per batch.
+        lefts = (starts[firsts] - bases[owners]).tolist()
+        rights = (ends[stops - 1] - bases[owners]).tolist()
+        spans = list(zip(lefts, rights))
+        bounds = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=len(texts)), out=bounds[1:])
+        bounds = bounds.tolist()
+        return [spans[low:high] for low, high in zip(bounds, bounds[1:])]
+
+    def _plan_windows(
+        self, begins: np.ndarray, limits: np.ndarray, sentence_ends: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(owner, first, stop)`` token windows of every text, in token order.
+
+        Texts advance one window per step in lockstep, so many short texts cost
+        a few array operations; the last few long ones finish in ``_windows``.
+        """
+        min_tokens = max(1, self.chunk_size // 2)
+        # A sentinel past every token keeps the ``searchsorted`` lookups in range.
+        padded = np.append(sentence_ends, np.iinfo(np.int64).max // 2)
+        active = np.flatnonzero(begins < limits)
+        first = begins[active]
+        owners, firsts, stops = [], [], []
+        while len(active) > _SCALAR_TAIL:
+            limit = limits[active]
+            stop = np.minimum(first + self.chunk_size, limit)
+            pos = np.searchsorted(padded, stop - 1, side="right") - 1
+            cut = padded[pos] + 1
+            snap = (stop < limit) & (pos >= 0) & (cut - first >= min_tokens)
+            stop = np.where(snap, cut, stop)
+            owners.append(active)
+            firsts.append(first)
+            stops.append(stop)
+            following = np.maximum(first + 1, stop - self.overlap)
+            start = padded[np.searchsorted(padded, following - 1)] + 1
+            following = np.where(start <= stop, start, following)
+            more = stop < limit
+            active, first = active[more], following[more]
+        tail_firsts: List[int] = []
+        tail_stops: List[int] = []
+        tail_owners: List[int] = []
+        sentence_list = sentence_ends.tolist()
+        for owner, begin in zip(active.tolist(), first.tolist()):
+            before = len(tail_firsts)
+            self._windows(
+                begin, int(limits[owner]), sentence_list, tail_firsts, tail_stops
             )
-        return chunks
+            tail_owners.extend([owner] * (len(tail_firsts) - before))
+        owners.append(np.asarray(tail_owners, dtype=np.int64))
+        firsts.append(np.asarray(tail_firsts, dtype=np.int64))
+        stops.append(np.asarray(tail_stops, dtype=np.int64))
+        owner, first, stop = map(np.concatenate, (owners, firsts, stops))
+        # Window starts are distinct and increase within a text, so sorting by
+        # them restores per-text order.
+        order = np.argsort(first, kind="stable")
+        return owner[order], first[order], stop[order]
+
+    def _windows(
+        self,
+        first: int,
+        limit: int,
+        sentence_ends: List[int],
+        firsts: List[int],
+        stops: List[int],
+    ) -> None:
+        """Append ``[first, stop)`` token windows up to ``limit``, snapped to
+        sentence edges."""
+        min_tokens = max(1, self.chunk_size // 2)
+        while first < limit:
+            stop = min(first + self.chunk_size, limit)
+            if stop < limit:
+                pos = bisect_right(sentence_ends, stop - 1) - 1
+                if pos >= 0 and sentence_ends[pos] + 1 - first >= min_tokens:
+                    stop = sentence_ends[pos] + 1
+            firsts.append(first)
+            stops.append(stop)
+            if stop >= limit:
+                return
+            following = max(first + 1, stop - self.overlap)
+            pos = bisect_left(sentence_ends, following - 1)
+            if pos < len(sentence_ends) and sentence_ends[pos] + 1 <= stop:
+                following = sentence_ends[pos] + 1
+            first = following
+
+    def _span_chunks(
+        self, document: Document, spans: List[tuple[int, int]]
+    ) -> List[DocumentChunk]:
+        # One metadata dict per document, shared by its chunks. Positional
+        # arguments keep construction cheap for many small documents.
+        metadata = {**document.metadata, "source_title": document.title}
+        doc_id, source = document.id, document.content
+        return [
+            SpanChunk(f"{doc_id}-chunk-{idx}", doc_id, source, start, end, metadata)
+            for idx, (start, end) in enumerate(spans)
+        ]
+
+    def chunk(self, document: Document) -> List[DocumentChunk]:
+        return self._span_chunks(document, self.spans(document.content))
+
+    def chunk_documents(self, documents: Iterable[Document]) -> Iterator[DocumentChunk]:
+        batch: List[Document] = []
+        size = 0
+        for document in documents:
+            batch.append(document)
+            size += len(document.content)
+            if size >= _BATCH_CHARS:
+                yield from self._chunk_batch(batch)
+                batch, size = [], 0
+        if batch:
+            yield from self._chunk_batch(batch)
+
+    def _chunk_batch(self, documents: List[Document]) -> Iterator[DocumentChunk]:
+        spans = self._batch_spans([document.content for document in documents])
+        for document, document_spans in zip(documents, spans):
+            yield from self._span_chunks(document, document_spans)
+
+
+@dataclass
+class IndexBudget:
+    """Limits for the compact index mode."""
+
+    max_bytes: Optional[int] = None
+    max_features: Optional[int] = None
+    prune_epsilon: float = 0.0
+
+
+@dataclass
+class IndexMemoryReport:
+    """Bytes held by an index: posting arrays plus the fitted vocabulary and idf."""
+
+    rows: int
+    vocabulary_size: int
+    postings: int
+    pruned_postings: int
+    structure_bytes: int
+    tfidf_bytes: int
+    lexical_bytes: int
+    vocabulary_bytes: int
+    idf_bytes: int
+    max_bytes: Optional[int] = None
+
+    @property
+    def total_bytes(self) -> int:
+        return (
+            self.structure_bytes
+            + self.tfidf_bytes
+            + self.lexical_bytes
+            + self.vocabulary_bytes
+            + self.idf_bytes
+        )
+
+    @property
+    def within_budget(self) -> bool:
+        return self.max_bytes is None or self.total_bytes <= self.max_bytes
+
+
+def matrix_nbytes(matrix) -> int:
+    """Bytes held by a CSR matrix's data, indices and indptr arrays."""
+    if matrix is None:
+        return 0
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+
+def vocabulary_nbytes(vocabulary: Optional[Dict[str, int]]) -> int:
+    """Approximate bytes held by a fitted term -> column dict and its entries."""
+    if vocabulary is None:
+        return 0
+    return sys.getsizeof(vocabulary) + sum(
+        sys.getsizeof(term) + sys.getsizeof(column)
+        for term, column in vocabulary.items()
+    )
+
+
+def _prune_postings(
+    tfidf: csr_matrix, budget: IndexBudget, reserved_bytes: int = 0
+) -> np.ndarray:
+    """Return a keep-mask over postings using per-term impact thresholds.
+
+    ``reserved_bytes`` (vocabulary and idf) is charged to ``max_bytes`` before
+    postings are allotted.
+    """
+    weights = tfidf.data
+    keep = np.ones(weights.shape[0], dtype=bool)
+    if not weights.size:
+        return keep
+    # Impact of a posting relative to the strongest posting of the same term.
+    term_max = np.zeros(tfidf.shape[1], dtype=np.float32)
+    np.maximum.at(term_max, tfidf.indices, weights)
+    impact = weights / term_max[tfidf.indices]
+    if budget.prune_epsilon > 0:
+        keep &= impact >= budget.prune_epsilon
+    if budget.max_bytes is not None:
+        fixed = (tfidf.shape[0] + 1) * _COMPACT_INDPTR_BYTES + reserved_bytes
+        allowed = max(0, (budget.max_bytes - fixed) // _COMPACT_POSTING_BYTES)
+        if int(keep.sum()) > allowed:
+            candidates = np.flatnonzero(keep)
+            order = np.argsort(-impact[candidates], kind="stable")
+            keep[:] = False
+            keep[candidates[order[:allowed]]] = True
+    return keep
 
 
 class HybridIndexer:
-    """TF-IDF indexer approximating dense + lexical scoring."""
+    """TF-IDF indexer approximating dense + lexical scoring.
+
+    Passing an ``IndexBudget`` switches to the compact mode: the TF-IDF and
+    lexical scorers share one float32/int32 CSR structure, the vocabulary is
+    capped and low-impact postings are pruned per term to fit ``max_bytes``.
 
-    def __init__(self) -> None:
+    Passing a ``NearDuplicateDetector`` groups near-duplicate chunks at build
+    time; with ``collapse_duplicates`` only one representative per group is
+    indexed, ``duplicates_of`` maps it back to every member and metadata
+    filters match it on any member's metadata.
+
+    Metadata predicates passed as ``filters`` are resolved against a
+    ``MetadataIndex`` first, so only the matching rows are scored.
+
+    ``text_store`` is the store backing lazily loaded chunk texts, if any;
+    ``close`` releases it and deletes its files.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[IndexBudget] = None,
+        dedup: Optional[NearDuplicateDetector] = None,
+        collapse_duplicates: bool = True,
+    ) -> None:
+        self.budget = budget
+        self.dedup = dedup
+        self.collapse_duplicates = collapse_duplicates
+        self.duplicate_groups: Optional[DuplicateGroups] = None
+        self.group_ids: Dict[str, str] = {}
+        self.metadata_index: Optional[MetadataIndex] = None
+        self.graph: Optional[ChunkGraph] = None
+        self.row_of: Dict[str, int] = {}
+        self.text_store: Optional[TextStore] = None
         self.vectorizer = TfidfVectorizer(stop_words="english")
         self.chunks: List[DocumentChunk] = []
         self.matrix = None
+        self.lexical_matrix = None
+        self.memory_report: Optional[IndexMemoryReport] = None
+        self._counter: Optional[CountVectorizer] = None
+        self._transformer: Optional[TfidfTransformer] = None
+
+    @property
+    def compact(self) -> bool:
+        return self.budget is not None
 
     def build(self, chunks: Sequence[DocumentChunk]) -> None:
-        self.chunks = list(chunks)
-        corpus = [chunk.text for chunk in self.chunks]
+        chunks = list(chunks)
+        members = None
+        if self.dedup is not None:
+            self.duplicate_groups = self.dedup.group(chunks)
+            self.group_ids = self.duplicate_groups.group_of()
+            if self.collapse_duplicates:
+                chunks = self.duplicate_groups.representatives
+                members = self.duplicate_groups.members
+        self.chunks = chunks
+        self.row_of = {chunk.chunk_id: row for row, chunk in enumerate(self.chunks)}
+        self.metadata_index = MetadataIndex.build(self.chunks, members=members)
+        self.graph = None
+        # A generator keeps lazily stored chunk texts out of memory while fitting.
+        corpus = (chunk.text for chunk in self.chunks)
+        if self.compact:
+            self._build_compact(corpus)
+            return
         self.matrix = self.vectorizer.fit_transform(corpus)
+        self.memory_report = IndexMemoryReport(
+            rows=self.matrix.shape[0],
+            vocabulary_size=len(self.vectorizer.vocabulary_),
+            postings=self.matrix.nnz,
+            pruned_postings=0,
+            structure_bytes=self.matrix.indices.nbytes + self.matrix.indptr.nbytes,
+            tfidf_bytes=self.matrix.data.nbytes,
+            lexical_bytes=0,
+            vocabulary_bytes=vocabulary_nbytes(self.vectorizer.vocabulary_),
+            idf_bytes=self.vectorizer.idf_.nbytes,
+        )
 
-    def search(self, query: str, top_k: int = 5) -> List[tuple[DocumentChunk, float]]:
-        if not self.chunks or self.matrix is None:
+    def _build_compact(self, corpus: Iterable[str]) -> None:
+        budget = self.budget
+        self._counter = CountVectorizer(
+            stop_words="english",
+            max_features=budget.max_features,
+            dtype=np.float32,
+        )
+        counts = self._counter.fit_transform(corpus).tocsr()
+        # ``stop_words_`` keeps every term dropped by ``max_features``.
+        if getattr(self._counter, "stop_words_", None) is not None:
+            self._counter.stop_words_ = None
+        self._transformer = TfidfTransformer()
+        tfidf = self._transformer.fit_transform(counts).tocsr()
+        tfidf.sort_indices()
+        counts.sort_indices()
+
+        total_postings = tfidf.nnz
+        vocabulary_bytes = vocabulary_nbytes(self._counter.vocabulary_)
+        idf_bytes = self._transformer.idf_.nbytes
+        keep = _prune_postings(tfidf, budget, vocabulary_bytes + idf_bytes)
+        row_ids = np.repeat(np.arange(tfidf.shape[0]), np.diff(tfidf.indptr))
+        indptr = np.zeros(tfidf.shape[0] + 1, dtype=np.int32)
+        np.cumsum(np.bincount(row_ids[keep], minlength=tfidf.shape[0]), out=indptr[1:])
+        indices = tfidf.indices[keep].astype(np.int32)
+        tfidf_data = tfidf.data[keep].astype(np.float32)
+        lexical_data = counts.data[keep].astype(np.float32)
+
+        # Rows are re-normalised after pruning so search is a plain sparse dot
+        # product, and both matrices reference the same indices/indptr arrays.
+        shape = tfidf.shape
+        self.matrix = csr_matrix((tfidf_data, indices, indptr), shape=shape, copy=False)
+        self.lexical_matrix = csr_matrix(
+            (lexical_data, indices, indptr), shape=shape, copy=False
+        )
+        for matrix in (self.matrix, self.lexical_matrix):
+            norms = np.sqrt(
+                np.bincount(row_ids[keep], weights=matrix.data**2, minlength=shape[0])
+            ).astype(np.float32)
+            norms[norms == 0] = 1.0
+            matrix.data /= norms[row_ids[keep]]
+        self.memory_report = IndexMemoryReport(
+            rows=shape[0],
+            vocabulary_size=len(self._counter.vocabulary_),
+            postings=int(indices.shape[0]),
+            pruned_postings=total_postings - int(indices.shape[0]),
+            structure_bytes=indices.nbytes + indptr.nbytes,
+            tfidf_bytes=self.matrix.data.nbytes,
+            lexical_bytes=self.lexical_matrix.data.nbytes,
+            vocabulary_bytes=vocabulary_bytes,
+            idf_bytes=idf_bytes,
+            max_bytes=budget.max_bytes,
+        )
+
+    def build_graph(self, k: int = 5, block_size: int = 256) -> ChunkGraph:
+        """Precompute the kNN + same-document chunk graph over the TF-IDF rows."""
+        if self.matrix is None:
             raise RuntimeError("Index has not been built.")
-        query_vec = self.vectorizer.transform([query])
-        scores = cosine_similarity(query_vec, self.matrix)[0]
-        ranked = sorted(
-            zip(self.chunks, scores),
-            key=lambda pair: pair[1],
-            reverse=True,
+        self.graph = build_chunk_graph(
+            self.matrix, self.chunks, k=k, block_size=block_size
         )
-        return ranked[:top_k]
+        return self.graph
 
-    def batch_search(
-        self, queries: Iterable[str], top_k: int = 5
+    def close(self) -> None:
+        if self.text_store is not None:
+            self.text_store.close(remove=True)
+            self.text_store = None
+
+    def duplicates_of(self, chunk_id: str) -> List[DocumentChunk]:
+        """Every chunk grouped with ``chunk_id``, including the chunk itself."""
+        if self.duplicate_groups is None:
+            return [chunk for chunk in self.chunks if chunk.chunk_id == chunk_id]
+        group_id = self.group_ids.get(chunk_id, chunk_id)
+        return list(self.duplicate_groups.members.get(group_id, []))
+
+    def _tfidf_scores(
+        self, query: str, rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        if not self.compact:
+            query_vec = self.vectorizer.transform([query])
+            return cosine_similarity(query_vec, matrix)[0]
+        counts = self._counter.transform([query])
+        query_vec = self._transformer.transform(counts)
+        return np.asarray((matrix @ query_vec.T).todense()).ravel()
+
+    def lexical_scores(
+        self, query: str, rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Cosine over raw term counts, served from the shared compact structure."""
+        if self.lexical_matrix is None:
+            raise RuntimeError("Lexical postings are only stored in compact mode.")
+        matrix = self.lexical_matrix if rows is None else self.lexical_matrix[rows]
+        query_vec = normalize(self._counter.transform([query]), copy=False)
+        return np.asarray((matrix @ query_vec.T).todense()).ravel()
+
+    def select_rows(self, filters: Sequence[Predicate]) -> Optional[np.ndarray]:
+        """Row ids passing every metadata predicate (``None`` means all rows)."""
+        if self.metadata_index is None:
+            raise RuntimeError("Index has not been built.")
+        return self.metadata_index.select(filters)
+
+    def search_rows(
+        self, query: str, top_k: int = 5, rows: Optional[np.ndarray] = None
+    ) -> List[tuple[int, float]]:
+        """Rank rows for ``query``; only ``rows`` are scored when given."""
+        if not self.chunks or self.matrix is None:
+            raise RuntimeError("Index has not been built.")
+        if rows is not None and not len(rows):
+            return []
+        scores = self._tfidf_scores(query, rows)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        row_ids = order if rows is None else rows[order]
+        return list(zip(row_ids.tolist(), scores[order].tolist()))
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Sequence[Predicate] = (),
     ) -> List[tuple[DocumentChunk, float]]:
-        aggregated: List[tuple[DocumentChunk, float]] = []
-        seen = {}
+        rows = self.select_rows(filters) if filters else None
+        return [
+            (self.chunks[row], score)
+            for row, score in self.search_rows(query, top_k=top_k, rows=rows)
+        ]
+
+    def batch_search_rows(
+        self,
+        queries: Iterable[str],
+        top_k: int = 5,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[tuple[int, float]]:
+        seen: Dict[int, float] = {}
         for query in queries:
-            for chunk, score in self.search(query, top_k=top_k):
-                if chunk.chunk_id not in seen or score > seen[chunk.chunk_id]:
-                    seen[chunk.chunk_id] = score
-        for chunk in self.chunks:
-            if chunk.chunk_id in seen:
-                aggregated.append((chunk, seen[chunk.chunk_id]))
+            for row, score in self.search_rows(query, top_k=top_k, rows=rows):
+                if row not in seen or score > seen[row]:
+                    seen[row] = score
+        aggregated = sorted(seen.items())
         aggregated.sort(key=lambda pair: pair[1], reverse=True)
         return aggregated[:top_k]
+
+    def batch_search(
+        self,
+        queries: Iterable[str],
+        top_k: int = 5,
+        filters: Sequence[Predicate] = (),
+    ) -> List[tuple[DocumentChunk, float]]:
+        rows = self.select_rows(filters) if filters else None
+        return [
+            (self.chunks[row], score)
+            for row, score in self.batch_search_rows(queries, top_k=top_k, rows=rows)
+        ]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .models import DocumentChunk
+
+
+@dataclass(frozen=True)
+class Equals:
+    field: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class OneOf:
+    field: str
+    values: tuple
+
+
+@dataclass(frozen=True)
+class InRange:
+    """Inclusive numeric range; either bound may be left open."""
+
+    field: str
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+
+Predicate = Union[Equals, OneOf, InRange]
+
+
+def _field_values(chunk: DocumentChunk) -> Dict[str, Any]:
+    return {**chunk.metadata, "document_id": chunk.document_id}
+
+
+def _as_key(value: Any) -> Optional[Hashable]:
+    if isinstance(value, (list, tuple, set, dict)):
+        return None
+    return value
+
+
+def _lookup_keys(value: Any) -> List[Hashable]:
+    """Keys to look up for ``value``; numeric-looking strings also try the number."""
+    key = _as_key(value)
+    if key is None:
+        return []
+    if not isinstance(value, str):
+        return [key]
+    for cast in (int, float):
+        try:
+            return [key, cast(value)]
+        except ValueError:
+            continue
+    return [key]
+
+
+class MetadataIndex:
+    """Sorted row-id postings per metadata value, plus numeric range columns.
+
+    List-valued fields (e.g. ``keywords``) are indexed once per element so
+    ``Equals("keywords", "chunking")`` matches any chunk carrying that keyword.
+    When ``members`` maps a chunk id to the near-duplicates it stands in for,
+    that row is indexed under the union of their metadata.
+    """
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.postings: Dict[str, Dict[Hashable, np.ndarray]] = {}
+        self.numeric: Dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        chunks: Sequence[DocumentChunk],
+        members: Optional[Mapping[str, Sequence[DocumentChunk]]] = None,
+    ) -> "MetadataIndex":
+        index = cls()
+        index.rows = len(chunks)
+        members = members or {}
+        postings: Dict[str, Dict[Hashable, List[int]]] = {}
+        numeric: Dict[str, List[tuple[float, int]]] = {}
+        for row, chunk in enumerate(chunks):
+            for member in members.get(chunk.chunk_id, [chunk]):
+                for field, raw in _field_values(member).items():
+                    values = raw if isinstance(raw, (list, tuple, set)) else [raw]
+                    for value in values:
+                        key = _as_key(value)
+                        if key is None:
+                            continue
+                        rows = postings.setdefault(field, {}).setdefault(key, [])
+                        if not rows or rows[-1] != row:
+                            rows.append(row)
+                        if isinstance(value, (int, float)) and not isinstance(
+                            value, bool
+                        ):
+                            numeric.setdefault(field, []).append((float(value), row))
+        for field, values in postings.items():
+            index.postings[field] = {
+                key: np.asarray(rows, dtype=np.int32) for key, rows in values.items()
+            }
+        for field, pairs in numeric.items():
+            pairs.sort()
+            index.numeric[field] = (
+                np.asarray([value for value, _ in pairs], dtype=np.float64),
+                np.asarray([row for _, row in pairs], dtype=np.int32),
+            )
+        return index
+
+    def _empty(self) -> np.ndarray:
+        return np.empty(0, dtype=np.int32)
+
+    def _match(self, predicate: Predicate) -> np.ndarray:
+        field_postings = self.postings.get(predicate.field, {})
+        if isinstance(predicate, (Equals, OneOf)):
+            if isinstance(predicate, Equals):
+                values: tuple = (predicate.value,)
+            else:
+                values = predicate.values
+            matches = [
+                field_postings[key]
+                for value in values
+                for key in _lookup_keys(value)
+                if key in field_postings
+            ]
+            if len(matches) == 1:
+                return matches[0]
+            return np.unique(np.concatenate(matches)) if matches else self._empty()
+        if isinstance(predicate, InRange):
+            if predicate.field not in self.numeric:
+                return self._empty()
+            values, rows = self.numeric[predicate.field]
+            start, stop = 0, len(values)
+            if predicate.low is not None:
+                start = np.searchsorted(values, predicate.low, side="left")
+            if predicate.high is not None:
+                stop = np.searchsorted(values, predicate.high, side="right")
+            return np.unique(rows[start:stop])
+        raise TypeError(f"Unsupported metadata predicate: {predicate!r}")
+
+    def select(self, predicates: Sequence[Predicate]) -> Optional[np.ndarray]:
+        """Sorted row ids matching every predicate, or ``None`` when unfiltered."""
+        if not predicates:
+            return None
+        ordered = sorted((self._match(p) for p in predicates), key=len)
+        selected = ordered[0]
+        for rows in ordered[1:]:
+            if not selected.size:
+                break
+            selected = np.intersect1d(selected, rows, assume_unique=True)
+        return selected
+
+
+def parse_filter(expression: str) -> Predicate:
+    """Parse ``field=value``, ``field=a|b``, ``field>=low`` or ``field<=high``.
+
+    Values stay strings; numeric-looking ones also match numeric metadata.
+    """
+    for operator in (">=", "<="):
+        if operator in expression:
+            field, raw = (part.strip() for part in expression.split(operator, 1))
+            bound = float(raw)
+            if operator == ">=":
+                return InRange(field=field, low=bound)
+            return InRange(field=field, high=bound)
+    if "=" not in expression:
+        raise ValueError(f"Invalid metadata filter: {expression!r}")
+    field, raw = (part.strip() for part in expression.split("=", 1))
+    if "|" in raw:
+        return OneOf(field=field, values=tuple(v.strip() for v in raw.split("|")))
+    return Equals(field=field, value=raw)
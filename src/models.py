@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 @dataclass
@@ -22,3 +22,31 @@ class DocumentChunk:
     document_id: str
     text: str
     metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class SpanChunk(DocumentChunk):
+    """``DocumentChunk`` stored as a ``[start, end)`` span of its document text.
+
+    The text is sliced from the shared source string on access, so overlapping
+    chunks do not hold copies of the same characters.
+    """
+
+    def __init__(
+        self,
+        chunk_id: str,
+        document_id: str,
+        source: str,
+        start: int,
+        end: int,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.chunk_id = chunk_id
+        self.document_id = document_id
+        self.metadata = metadata if metadata is not None else {}
+        self.source = source
+        self.start = start
+        self.end = end
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start : self.end]
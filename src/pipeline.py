@@ -1,40 +1,77 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Sequence, Tuple, Union
 
 import typer
 from rich.console import Console
 from rich.table import Table
 
-from .data_loader import load_documents
+from .data_loader import iter_documents
+from .dedup import NearDuplicateDetector
+from .deadline import Deadline
+from .fusion import FusionRetriever
 from .generation import TemplateGenerator
-from .indexing import HybridIndexer, SemanticChunker
+from .indexing import HybridIndexer, IndexBudget, IndexMemoryReport, SemanticChunker
+from .metadata_index import Predicate, parse_filter
 from .models import DocumentChunk
 from .query_processor import QueryProcessor
 from .refrag import RefragCompressor, RefragDecoder, RefragSelector
-from .retrieval import HybridRetriever
+from .retrieval import GraphExpander, HybridRetriever
+from .text_store import store_chunks
 from .reranker import CrossEncoderReranker
 
 console = Console()
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 
 
+@dataclass
+class PipelineConfig:
+    """Tunable knobs spread across the chunking, retrieval, rerank and REFRAG stages."""
+
+    top_k: int = 6
+    rerank_top_k: int = 4
+    retrieval_weight: float = 0.5
+    rerank_weight: float = 0.5
+    micro_size: int = 16
+    retain_ratio: float = 0.3
+    tight_retain_ratio: float = 0.15
+    chunk_size: int = 80
+    overlap: int = 20
+
+
 @dataclass
 class PipelineArtifacts:
     chunks: List[DocumentChunk]
     refrag_summary: str
     answer_outline: str
+    degradations: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    index_version: Optional[str] = None
 
 
-def build_pipeline(data_path: str) -> Tuple[HybridRetriever, QueryProcessor]:
-    documents = load_documents(data_path)
-    chunker = SemanticChunker()
-    chunks = []
-    for document in documents:
-        chunks.extend(chunker.chunk(document))
-    indexer = HybridIndexer()
+def build_pipeline(
+    data_path: str,
+    budget: Optional[IndexBudget] = None,
+    dedup: Optional[NearDuplicateDetector] = None,
+    collapse_duplicates: bool = True,
+    graph_k: Optional[int] = None,
+    text_store: Optional[str] = None,
+    config: Optional[PipelineConfig] = None,
+) -> Tuple[HybridRetriever, QueryProcessor]:
+    config = config or PipelineConfig()
+    chunker = SemanticChunker(chunk_size=config.chunk_size, overlap=config.overlap)
+    chunks = chunker.chunk_documents(iter_documents(data_path))
+    store = None
+    if text_store is not None:
+        store, chunks = store_chunks(chunks, text_store)
+    indexer = HybridIndexer(
+        budget=budget, dedup=dedup, collapse_duplicates=collapse_duplicates
+    )
+    indexer.text_store = store
     indexer.build(chunks)
+    if graph_k:
+        indexer.build_graph(k=graph_k)
     retriever = HybridRetriever(indexer=indexer)
     return retriever, QueryProcessor()
 
@@ -42,57 +79,197 @@ def build_pipeline(data_path: str) -> Tuple[HybridRetriever, QueryProcessor]:
 def run_pipeline(
     query: str,
     data_path: str = "data/knowledge_base.json",
-    retriever: Optional[HybridRetriever] = None,
+    retriever: Optional[Union[HybridRetriever, FusionRetriever]] = None,
     processor: Optional[QueryProcessor] = None,
+    diversify: bool = False,
+    filters: Sequence[Predicate] = (),
+    expander: Optional[GraphExpander] = None,
+    deadline: Optional[Deadline] = None,
+    config: Optional[PipelineConfig] = None,
 ) -> PipelineArtifacts:
+    config = config or PipelineConfig()
     if retriever is None or processor is None:
-        retriever, processor = build_pipeline(data_path)
+        retriever, processor = build_pipeline(data_path, config=config)
+    deadline = deadline if deadline is not None else Deadline.unbounded()
     bundle = processor.process(query)
-    retrieval_results = retriever.retrieve(bundle, top_k=6)
-    reranker = CrossEncoderReranker()
-    reranked = reranker.rerank(query, retrieval_results, top_k=4)
-    top_chunks = [result.chunk for result in reranked]
+    rewrites = deadline.plan_rewrites(len(bundle.rewrites), chunks=config.rerank_top_k)
+    bundle = replace(bundle, rewrites=bundle.rewrites[:rewrites])
+    top_k = deadline.plan_pool(
+        config.top_k,
+        reduced=config.rerank_top_k,
+        rewrites=len(bundle.rewrites),
+        chunks=config.rerank_top_k,
+    )
+    with deadline.stage("retrieve", units=len(bundle.rewrites)):
+        retrieval_results = retriever.retrieve(
+            bundle, top_k=top_k, diversify=diversify, filters=filters
+        )
+        if expander is not None:
+            retrieval_results = expander.expand(
+                retrieval_results, retriever.indexer, filters=filters
+            )
+
+    to_rerank = deadline.plan_rerank(
+        len(retrieval_results),
+        keep=config.rerank_top_k,
+        chunks=config.rerank_top_k,
+    )
+    if to_rerank:
+        reranker = CrossEncoderReranker()
+        with deadline.stage("rerank", units=to_rerank):
+            reranked = reranker.rerank(
+                query,
+                retrieval_results[:to_rerank],
+                top_k=config.rerank_top_k,
+                retrieval_weight=config.retrieval_weight,
+                rerank_weight=config.rerank_weight,
+            )
+        top_chunks = [result.chunk for result in reranked]
+    else:
+        top_chunks = [
+            result.chunk for result in retrieval_results[: config.rerank_top_k]
+        ]
 
     # REFRAG-inspired compression
-    compressor = RefragCompressor()
-    selector = RefragSelector()
-    decoder = RefragDecoder()
-    micros = compressor.compress_documents(top_chunks)
-    selected = selector.select(query, micros)
-    refrag_summary = decoder.decode(selected)
-
-    generator = TemplateGenerator()
-    outline = generator.generate(
-        query=query,
-        chunks=top_chunks,
-        refrag_summary=refrag_summary,
+    retain_ratio = deadline.plan_retain_ratio(
+        config.retain_ratio, tight_ratio=config.tight_retain_ratio
     )
+    with deadline.stage("refrag", units=len(top_chunks)):
+        compressor = RefragCompressor(micro_size=config.micro_size)
+        selector = RefragSelector(retain_ratio=retain_ratio)
+        decoder = RefragDecoder()
+        micros = compressor.compress_documents(top_chunks)
+        selected = selector.select(query, micros)
+        refrag_summary = decoder.decode(selected)
+
+    with deadline.stage("generate"):
+        generator = TemplateGenerator()
+        outline = generator.generate(
+            query=query,
+            chunks=top_chunks,
+            refrag_summary=refrag_summary,
+        )
     return PipelineArtifacts(
         chunks=top_chunks,
         refrag_summary=refrag_summary,
         answer_outline=outline,
+        degradations=list(deadline.degradations),
+        elapsed_ms=deadline.elapsed_ms,
     )
 
 
+def render_memory_report(report: IndexMemoryReport) -> Table:
+    table = Table(title="Index Memory Report")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    budget = f"{report.max_bytes:,}" if report.max_bytes is not None else "-"
+    table.add_row("Rows", str(report.rows))
+    table.add_row("Vocabulary", str(report.vocabulary_size))
+    table.add_row("Postings kept", str(report.postings))
+    table.add_row("Postings pruned", str(report.pruned_postings))
+    table.add_row("Structure bytes", f"{report.structure_bytes:,}")
+    table.add_row("TF-IDF bytes", f"{report.tfidf_bytes:,}")
+    table.add_row("Lexical bytes", f"{report.lexical_bytes:,}")
+    table.add_row("Vocabulary bytes", f"{report.vocabulary_bytes:,}")
+    table.add_row("IDF bytes", f"{report.idf_bytes:,}")
+    table.add_row("Total bytes", f"{report.total_bytes:,}")
+    table.add_row("Budget bytes", budget)
+    return table
+
+
 @app.command()
 def ask(
     query: str = typer.Argument(..., help="Question to run through the RAG pipeline."),
     data_path: str = typer.Option(
         "data/knowledge_base.json", help="Path to the knowledge base JSON."
     ),
+    index_budget_kb: Optional[int] = typer.Option(
+        None, help="Build the compact index mode within this many kilobytes."
+    ),
+    max_features: Optional[int] = typer.Option(
+        None, help="Vocabulary cap for the compact index mode."
+    ),
+    dedup: bool = typer.Option(
+        False, help="Collapse near-duplicate chunks while building the index."
+    ),
+    diversify: bool = typer.Option(
+        False,
+        help="Return at most one chunk per near-duplicate group; groups chunks "
+        "without collapsing them unless --dedup is also given.",
+    ),
+    metadata_filter: Optional[List[str]] = typer.Option(
+        None,
+        "--filter",
+        help="Metadata predicate: field=value, field=a|b, field>=low or field<=high.",
+    ),
+    graph_k: Optional[int] = typer.Option(
+        None, help="Precompute a kNN chunk graph with this many neighbours per chunk."
+    ),
+    graph_hops: int = typer.Option(
+        1, help="Hops to walk from the top seeds when the chunk graph is built."
+    ),
+    fusion: Optional[str] = typer.Option(
+        None, help="Fuse first-stage retrievers concurrently: 'rrf' or 'weighted'."
+    ),
+    retriever_timeout: Optional[float] = typer.Option(
+        None, help="Seconds before a slow first-stage retriever is dropped."
+    ),
+    text_store: Optional[str] = typer.Option(
+        None, help="Directory for an mmap'd chunk text store; texts load lazily."
+    ),
+    deadline_ms: Optional[float] = typer.Option(
+        None, help="Latency budget; later stages degrade when it runs short."
+    ),
 ) -> None:
-    retriever, processor = build_pipeline(data_path)
+    budget = None
+    if index_budget_kb is not None or max_features is not None:
+        budget = IndexBudget(
+            max_bytes=index_budget_kb * 1024 if index_budget_kb is not None else None,
+            max_features=max_features,
+        )
+    detector = NearDuplicateDetector() if dedup or diversify else None
+    hybrid, processor = build_pipeline(
+        data_path,
+        budget=budget,
+        dedup=detector,
+        collapse_duplicates=dedup,
+        graph_k=graph_k,
+        text_store=text_store,
+    )
+    if budget is not None:
+        console.print(render_memory_report(hybrid.indexer.memory_report))
+    retriever: Union[HybridRetriever, FusionRetriever] = hybrid
+    if fusion is not None:
+        timeouts = None
+        if retriever_timeout is not None:
+            timeouts = {"tfidf": retriever_timeout, "lexical": retriever_timeout}
+        retriever = FusionRetriever.from_hybrid(
+            hybrid, method=fusion, timeouts=timeouts
+        )
     artifacts = run_pipeline(
         query=query,
         data_path=data_path,
         retriever=retriever,
         processor=processor,
+        diversify=diversify,
+        filters=[parse_filter(expression) for expression in metadata_filter or []],
+        expander=GraphExpander(hops=graph_hops) if graph_k else None,
+        deadline=Deadline(deadline_ms) if deadline_ms is not None else None,
     )
     table = Table(title="Advanced RAG Pipeline Output")
     table.add_column("REFRAG Summary", style="cyan", overflow="fold")
     table.add_column("Answer Outline", style="green", overflow="fold")
     table.add_row(artifacts.refrag_summary, artifacts.answer_outline)
     console.print(table)
+    if deadline_ms is not None:
+        applied = ", ".join(artifacts.degradations) or "none"
+        console.print(
+            f"[yellow]Elapsed {artifacts.elapsed_ms:.1f} ms of {deadline_ms:g} ms; "
+            f"degradations: {applied}"
+        )
+    if retriever is not hybrid:
+        retriever.close()
+    hybrid.close()
 
 
 if __name__ == "__main__":
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Sequence
+from typing import Dict, List, Optional, Sequence
 
+import numpy as np
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
 from .indexing import HybridIndexer
+from .metadata_index import Predicate
 from .models import DocumentChunk
 from .query_processor import QueryBundle
 
@@ -17,39 +19,161 @@ class RetrievalResult:
     score: float
 
 
+class TfidfRetriever:
+    """First-stage TF-IDF scorer over every query rewrite."""
+
+    def __init__(self, indexer: HybridIndexer) -> None:
+        self.indexer = indexer
+
+    def search(
+        self, bundle: QueryBundle, top_k: int, rows: Optional[np.ndarray] = None
+    ) -> List[tuple[int, float]]:
+        return self.indexer.batch_search_rows(bundle.rewrites, top_k=top_k, rows=rows)
+
+
+class LexicalRetriever:
+    """First-stage term-count cosine scorer on the original query."""
+
+    def __init__(self, indexer: HybridIndexer) -> None:
+        self.indexer = indexer
+        self.vectorizer: Optional[CountVectorizer] = None
+        self.matrix = None
+        if indexer.lexical_matrix is not None:
+            # Compact indexes already carry lexical weights on the shared postings.
+            return
+        if indexer.chunks:
+            corpus = (chunk.text for chunk in indexer.chunks)
+            self.vectorizer = CountVectorizer(stop_words="english")
+            self.matrix = self.vectorizer.fit_transform(corpus)
+
+    def scores(self, query: str, rows: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Lexical cosine for ``rows`` (every row when ``None``)."""
+        row_ids = None if rows is None else np.asarray(rows, dtype=np.int64)
+        if self.indexer.lexical_matrix is not None:
+            return self.indexer.lexical_scores(query, row_ids)
+        size = len(self.indexer.chunks) if row_ids is None else len(row_ids)
+        if self.matrix is None or not size:
+            return np.zeros(size)
+        matrix = self.matrix if row_ids is None else self.matrix[row_ids]
+        query_vec = self.vectorizer.transform([query])
+        return cosine_similarity(query_vec, matrix)[0]
+
+    def search(
+        self, bundle: QueryBundle, top_k: int, rows: Optional[np.ndarray] = None
+    ) -> List[tuple[int, float]]:
+        if rows is not None and not len(rows):
+            return []
+        scores = self.scores(bundle.original, rows)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        row_ids = order if rows is None else rows[order]
+        return list(zip(row_ids.tolist(), scores[order].tolist()))
+
+
 class HybridRetriever:
     """Combines TF-IDF similarity with lightweight lexical overlap."""
 
     def __init__(self, indexer: HybridIndexer) -> None:
         self.indexer = indexer
-        self.lexical_vectorizer = CountVectorizer(stop_words="english")
-        self._fit_lexical()
-
-    def _fit_lexical(self) -> None:
-        corpus = [chunk.text for chunk in self.indexer.chunks]
-        if corpus:
-            self.lexical_matrix = self.lexical_vectorizer.fit_transform(corpus)
-        else:
-            self.lexical_matrix = None
-
-    def _lexical_score(self, query: str) -> List[float]:
-        if self.lexical_matrix is None:
-            return [0.0] * len(self.indexer.chunks)
-        query_vec = self.lexical_vectorizer.transform([query])
-        scores = cosine_similarity(query_vec, self.lexical_matrix)[0]
-        return scores.tolist()
-
-    def retrieve(self, bundle: QueryBundle, top_k: int = 6) -> List[RetrievalResult]:
-        tfidf_candidates = self.indexer.batch_search(bundle.rewrites, top_k=top_k * 2)
-        lexical_scores = self._lexical_score(bundle.original)
+        self.tfidf = TfidfRetriever(indexer)
+        self.lexical = LexicalRetriever(indexer)
+
+    @property
+    def lexical_matrix(self):
+        return self.lexical.matrix
+
+    def close(self) -> None:
+        self.indexer.close()
+
+    def retrieve(
+        self,
+        bundle: QueryBundle,
+        top_k: int = 6,
+        diversify: bool = False,
+        filters: Sequence[Predicate] = (),
+    ) -> List[RetrievalResult]:
+        rows = self.indexer.select_rows(filters) if filters else None
+        pool = top_k * 4 if diversify else top_k * 2
+        tfidf_candidates = self.tfidf.search(bundle, top_k=pool, rows=rows)
+        candidate_rows = [row for row, _ in tfidf_candidates]
+        lexical_scores = self.lexical.scores(bundle.original, candidate_rows).tolist()
         combined = []
-        for chunk, tfidf_score in tfidf_candidates:
-            lex_score = lexical_scores[self.indexer.chunks.index(chunk)]
+        for (row, tfidf_score), lex_score in zip(tfidf_candidates, lexical_scores):
             score = 0.7 * tfidf_score + 0.3 * lex_score
+            chunk = self.indexer.chunks[row]
             combined.append(RetrievalResult(chunk=chunk, score=score))
         combined.sort(key=lambda item: item.score, reverse=True)
+        if diversify:
+            combined = diversify_by_group(combined, self.indexer.group_ids)
         return combined[:top_k]
 
 
+class GraphExpander:
+    """Pulls graph neighbours of the top seeds into the candidate pool.
+
+    Walks ``hops`` steps over the indexer's precomputed ``ChunkGraph``; each
+    neighbour inherits its parent's score scaled by the edge weight and
+    ``decay``, so expansion never scores the full corpus again.
+    """
+
+    def __init__(
+        self, hops: int = 1, seeds: int = 3, max_new: int = 4, decay: float = 0.5
+    ) -> None:
+        self.hops = hops
+        self.seeds = seeds
+        self.max_new = max_new
+        self.decay = decay
+
+    def expand(
+        self,
+        results: Sequence[RetrievalResult],
+        indexer: HybridIndexer,
+        filters: Sequence[Predicate] = (),
+    ) -> List[RetrievalResult]:
+        graph = indexer.graph
+        if graph is None or not results:
+            return list(results)
+        allowed = indexer.select_rows(filters) if filters else None
+        allowed_rows = None if allowed is None else set(allowed.tolist())
+        known = {indexer.row_of[result.chunk.chunk_id] for result in results}
+        frontier = [
+            (indexer.row_of[result.chunk.chunk_id], result.score)
+            for result in results[: self.seeds]
+        ]
+        discovered: Dict[int, float] = {}
+        for _ in range(self.hops):
+            next_frontier = []
+            for row, score in frontier:
+                for neighbour, weight in graph.neighbours(row):
+                    if neighbour in known:
+                        continue
+                    if allowed_rows is not None and neighbour not in allowed_rows:
+                        continue
+                    propagated = score * weight * self.decay
+                    if propagated > discovered.get(neighbour, 0.0):
+                        discovered[neighbour] = propagated
+                        next_frontier.append((neighbour, propagated))
+            frontier = next_frontier
+        ranked = sorted(discovered.items(), key=lambda pair: pair[1], reverse=True)
+        expanded = list(results)
+        for row, score in ranked[: self.max_new]:
+            expanded.append(RetrievalResult(chunk=indexer.chunks[row], score=score))
+        return expanded
+
+
+def diversify_by_group(
+    results: Sequence[RetrievalResult], group_ids: Dict[str, str]
+) -> List[RetrievalResult]:
+    """Keep only the best-scoring result of each near-duplicate group."""
+    seen = set()
+    diversified: List[RetrievalResult] = []
+    for result in results:
+        group = group_ids.get(result.chunk.chunk_id, result.chunk.chunk_id)
+        if group in seen:
+            continue
+        seen.add(group)
+        diversified.append(result)
+    return diversified
+
+
 def aggregate_context(chunks: Sequence[DocumentChunk]) -> str:
     return "\n".join(f"- {chunk.text}" for chunk in chunks)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .models import DocumentChunk
+
+BLOB_NAME = "texts.bin"
+OFFSETS_NAME = "offsets.npy"
+
+
+class TextStoreWriter:
+    """Appends UTF-8 texts to a blob and records their byte offsets.
+
+    Stores are write-once: the blob is created exclusively and the offsets
+    table is renamed into place on ``close``, so an existing store (which
+    readers may have mapped) is never modified.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._blob = (self.directory / BLOB_NAME).open("xb")
+        self._offsets: List[int] = [0]
+
+    def append(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._blob.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+        return len(self._offsets) - 2
+
+    def close(self) -> None:
+        self._blob.close()
+        offsets = np.asarray(self._offsets, dtype=np.int64)
+        partial = self.directory / f"{OFFSETS_NAME}.partial"
+        with partial.open("wb") as handle:
+            np.save(handle, offsets)
+        os.replace(partial, self.directory / OFFSETS_NAME)
+
+    def __enter__(self) -> "TextStoreWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TextStore:
+    """Read-only text table backed by an mmap'd blob and an offsets array.
+
+    Pages are only faulted in for the rows that are actually read, so resident
+    memory does not grow with the corpus text size.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.offsets = np.load(self.directory / OFFSETS_NAME, mmap_mode="r")
+        self._file = (self.directory / BLOB_NAME).open("rb")
+        self._blob: Optional[mmap.mmap] = None
+        if self.offsets[-1] > 0:
+            self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get(self, row: int) -> str:
+        start, stop = int(self.offsets[row]), int(self.offsets[row + 1])
+        if self._blob is None or start == stop:
+            return ""
+        return self._blob[start:stop].decode("utf-8")
+
+    def close(self, remove: bool = False) -> None:
+        """Release the mapping; ``remove`` also deletes the store directory."""
+        if self._blob is not None:
+            self._blob.close()
+        self._file.close()
+        if remove:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class StoredChunk(DocumentChunk):
+    """``DocumentChunk`` whose text is decoded from a ``TextStore`` on access."""
+
+    def __init__(
+        self,
+        chunk_id: str,
+        document_id: str,
+        store: TextStore,
+        row: int,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.chunk_id = chunk_id
+        self.document_id = document_id
+        self.metadata = metadata if metadata is not None else {}
+        self.store = store
+        self.row = row
+
+    @property
+    def text(self) -> str:
+        return self.store.get(self.row)
+
+
+def store_chunks(
+    chunks: Iterable[DocumentChunk], directory: str | Path
+) -> Tuple[TextStore, List[StoredChunk]]:
+    """Spill chunk texts to a fresh store under ``directory``.
+
+    Every call writes its own ``texts-*`` subdirectory, so rebuilding into the
+    same ``directory`` leaves stores that earlier index versions still read
+    untouched. Returns the store and text-free chunk handles.
+    """
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    version = Path(tempfile.mkdtemp(prefix="texts-", dir=root))
+    headers = []
+    with TextStoreWriter(version) as writer:
+        for chunk in chunks:
+            row = writer.append(chunk.text)
+            headers.append((chunk.chunk_id, chunk.document_id, chunk.metadata, row))
+    store = TextStore(version)
+    stored = [
+        StoredChunk(chunk_id, document_id, store, row, metadata=metadata)
+        for chunk_id, document_id, metadata, row in headers
+    ]
+    return store, stored
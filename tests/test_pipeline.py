@@ -1,8 +1,35 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+import pytest
+
+from src.autotune import (
+    PipelineCache,
+    TrialResult,
+    choose,
+    export_yaml,
+    pareto_front,
+    sample_configs,
+    successive_halving,
+)
+from src.chunk_graph import ChunkGraph, build_chunk_graph
 from src.data_loader import load_documents
-from src.indexing import SemanticChunker
-from src.pipeline import build_pipeline, run_pipeline
+from src.deadline import Deadline, StageCostModel
+from src.dedup import NearDuplicateDetector
+from src.evaluation import load_samples
+from src.fusion import FusionRetriever
+from src.index_manager import IndexManager, save_snapshot, snapshot_builder
+from src.indexing import HybridIndexer, IndexBudget, SemanticChunker, token_offsets
+from src.metadata_index import Equals, InRange, MetadataIndex, OneOf, parse_filter
+from src.models import Document, DocumentChunk, SpanChunk
+from src.pipeline import PipelineConfig, build_pipeline, run_pipeline
+from src.query_processor import QueryProcessor
+from src.refrag_tuning import load_config as load_refrag_config
+from src.retrieval import GraphExpander, HybridRetriever
+from src.text_store import StoredChunk, TextStore, TextStoreWriter
 
 DATA_PATH = Path("data/knowledge_base.json")
 
@@ -33,3 +60,474 @@ def test_run_pipeline_produces_refrag_summary():
     assert artifacts.chunks, "Pipeline should retrieve chunks."
     assert len(artifacts.refrag_summary.split()) > 0
     assert "rerank" in artifacts.answer_outline.lower()
+
+
+def test_compact_index_shares_postings_and_respects_budget():
+    retriever, _ = build_pipeline(
+        str(DATA_PATH), budget=IndexBudget(max_bytes=22 * 1024, max_features=150)
+    )
+    indexer = retriever.indexer
+    report = indexer.memory_report
+    assert indexer.matrix.dtype == np.float32
+    assert indexer.matrix.indices.dtype == np.int32
+    assert np.shares_memory(indexer.matrix.indices, indexer.lexical_matrix.indices)
+    assert report.vocabulary_size <= 150
+    assert report.vocabulary_bytes > 0
+    assert report.idf_bytes == indexer._transformer.idf_.nbytes
+    assert report.pruned_postings > 0
+    assert report.within_budget
+
+    # The vocabulary alone outgrows 2 KB, so that budget cannot be met.
+    tiny, _ = build_pipeline(
+        str(DATA_PATH), budget=IndexBudget(max_bytes=2048, max_features=150)
+    )
+    assert not tiny.indexer.memory_report.within_budget
+
+
+def test_compact_index_matches_default_scores_without_pruning():
+    default_retriever, processor = build_pipeline(str(DATA_PATH))
+    compact_retriever, _ = build_pipeline(str(DATA_PATH), budget=IndexBudget())
+    bundle = processor.process("How does reranking improve the RAG pipeline?")
+    default_ids = [r.chunk.chunk_id for r in default_retriever.retrieve(bundle)]
+    compact_ids = [r.chunk.chunk_id for r in compact_retriever.retrieve(bundle)]
+    assert default_ids == compact_ids
+
+
+def _duplicated_chunks():
+    documents = load_documents(DATA_PATH)
+    chunker = SemanticChunker()
+    chunks = [chunk for document in documents for chunk in chunker.chunk(document)]
+    copy = documents[0]
+    mirror = Document(
+        id=f"{copy.id}-mirror",
+        title=copy.title,
+        content=copy.content + " (mirrored page)",
+        metadata=copy.metadata,
+    )
+    return chunks + chunker.chunk(mirror), copy.id
+
+
+def test_near_duplicate_chunks_collapse_with_provenance():
+    chunks, original_id = _duplicated_chunks()
+    indexer = HybridIndexer(dedup=NearDuplicateDetector())
+    indexer.build(chunks)
+    assert len(indexer.chunks) == len(chunks) - 1
+    members = indexer.duplicates_of(f"{original_id}-chunk-0")
+    assert {chunk.document_id for chunk in members} == {
+        original_id,
+        f"{original_id}-mirror",
+    }
+    # The collapsed mirror's metadata still reaches its representative's row.
+    rows = indexer.select_rows([Equals("document_id", f"{original_id}-mirror")])
+    assert f"{original_id}-chunk-0" in {indexer.chunks[row].chunk_id for row in rows}
+
+
+def test_diversify_returns_one_chunk_per_duplicate_group():
+    chunks, _ = _duplicated_chunks()
+    indexer = HybridIndexer(dedup=NearDuplicateDetector(), collapse_duplicates=False)
+    indexer.build(chunks)
+    retriever = HybridRetriever(indexer=indexer)
+    bundle = QueryProcessor().process("Retrieval-Augmented Generation grounds models")
+    results = retriever.retrieve(bundle, top_k=4, diversify=True)
+    groups = [indexer.group_ids[result.chunk.chunk_id] for result in results]
+    assert len(groups) == len(set(groups))
+
+
+def test_build_pipeline_can_group_duplicates_without_collapsing():
+    collapsed, _ = build_pipeline(str(DATA_PATH), dedup=NearDuplicateDetector())
+    grouped, _ = build_pipeline(
+        str(DATA_PATH), dedup=NearDuplicateDetector(), collapse_duplicates=False
+    )
+    assert len(grouped.indexer.chunks) == len(grouped.indexer.group_ids)
+    assert len(collapsed.indexer.chunks) == len(
+        set(collapsed.indexer.group_ids.values())
+    )
+
+
+def test_metadata_filters_restrict_scored_rows():
+    retriever, processor = build_pipeline(str(DATA_PATH))
+    bundle = processor.process("How does the pipeline work?")
+    results = retriever.retrieve(
+        bundle, top_k=6, filters=[OneOf(field="stage", values=("sense", "expand"))]
+    )
+    assert results
+    assert {result.chunk.metadata["stage"] for result in results} <= {"sense", "expand"}
+    keyword = retriever.indexer.search(
+        "pipeline", filters=[parse_filter("keywords=chunking")]
+    )
+    assert [chunk.document_id for chunk, _ in keyword] == ["stage-indexing"]
+
+
+def test_metadata_index_supports_range_predicates():
+    chunks = [
+        DocumentChunk(
+            chunk_id=f"c{year}", document_id="d", text="t", metadata={"year": year}
+        )
+        for year in (2019, 2021, 2023)
+    ]
+    index = MetadataIndex.build(chunks)
+    assert index.select([InRange(field="year", low=2020, high=2023)]).tolist() == [1, 2]
+    assert index.select([parse_filter("year<=2019")]).tolist() == [0]
+    assert index.select([Equals(field="year", value=2030)]).size == 0
+    assert index.select([parse_filter("year=2023")]).tolist() == [2]
+    assert index.select([parse_filter("year=2019|2021.0")]).tolist() == [0, 1]
+
+
+def test_chunk_graph_blocks_match_and_link_document_neighbours(tmp_path):
+    documents = load_documents(DATA_PATH)
+    chunker = SemanticChunker(chunk_size=20, overlap=5)
+    chunks = [chunk for document in documents for chunk in chunker.chunk(document)]
+    indexer = HybridIndexer()
+    indexer.build(chunks)
+    graph = indexer.build_graph(k=3, block_size=256)
+    blocked = build_chunk_graph(indexer.matrix, chunks, k=3, block_size=4)
+    assert graph.indices.tolist() == blocked.indices.tolist()
+    first, second = chunks[0].chunk_id, chunks[1].chunk_id
+    assert chunks[0].document_id == chunks[1].document_id
+    neighbours = dict(graph.neighbours(indexer.row_of[first]))
+    assert indexer.row_of[second] in neighbours
+
+    path = tmp_path / "graph.npz"
+    graph.save(path)
+    assert ChunkGraph.load(path).weights.tolist() == graph.weights.tolist()
+
+
+def test_graph_expansion_adds_unseen_neighbours():
+    retriever, processor = build_pipeline(str(DATA_PATH), graph_k=3)
+    bundle = processor.process("How does reranking improve the RAG pipeline?")
+    results = retriever.retrieve(bundle, top_k=2)
+    expanded = GraphExpander(hops=2, max_new=3).expand(results, retriever.indexer)
+    seed_ids = {result.chunk.chunk_id for result in results}
+    new_ids = [result.chunk.chunk_id for result in expanded[len(results) :]]
+    assert new_ids and not seed_ids & set(new_ids)
+    assert len(new_ids) <= 3
+
+
+class _SlowRetriever:
+    def search(self, bundle, top_k, rows=None):
+        time.sleep(0.5)
+        return [(0, 1.0)]
+
+
+def test_fusion_retriever_fuses_rankings_and_drops_slow_backends():
+    retriever, processor = build_pipeline(str(DATA_PATH))
+    bundle = processor.process("How does reranking improve the RAG pipeline?")
+    fusion = FusionRetriever(
+        retriever.indexer,
+        {
+            "tfidf": retriever.tfidf,
+            "lexical": retriever.lexical,
+            "slow": _SlowRetriever(),
+        },
+        timeouts={"slow": 0.05},
+    )
+    started = time.perf_counter()
+    outcome = fusion.fuse(bundle, top_k=4)
+    assert time.perf_counter() - started < 0.4
+    assert outcome.dropped == ["slow"]
+    assert len(outcome.results) == 4
+    hybrid_top = retriever.retrieve(bundle, top_k=1)[0].chunk.chunk_id
+    assert outcome.results[0].chunk.chunk_id == hybrid_top
+    fusion.close()
+
+
+def test_fusion_retriever_stays_fast_across_requests_with_stalled_backend():
+    retriever, processor = build_pipeline(str(DATA_PATH))
+    bundle = processor.process("How does reranking improve the RAG pipeline?")
+    fusion = FusionRetriever(
+        retriever.indexer,
+        {
+            "tfidf": retriever.tfidf,
+            "lexical": retriever.lexical,
+            "slow": _SlowRetriever(),
+        },
+        timeouts={"slow": 0.05},
+        default_timeout=0.3,
+        workers_per_retriever=2,
+    )
+    for _ in range(4):
+        started = time.perf_counter()
+        outcome = fusion.fuse(bundle, top_k=4)
+        assert time.perf_counter() - started < 0.3
+        assert outcome.dropped == ["slow"]
+        assert set(outcome.latencies) == {"tfidf", "lexical"}
+    fusion.close()
+
+
+class _DelayedRetriever:
+    def __init__(self, inner, delay):
+        self.inner = inner
+        self.delay = delay
+
+    def search(self, bundle, top_k, rows=None):
+        time.sleep(self.delay)
+        return self.inner.search(bundle, top_k, rows)
+
+
+class _FailingRetriever:
+    def search(self, bundle, top_k, rows=None):
+        raise RuntimeError("backend down")
+
+
+def test_fusion_retriever_queues_concurrent_requests_and_drops_failures():
+    retriever, processor = build_pipeline(str(DATA_PATH))
+    bundle = processor.process("How does reranking improve the RAG pipeline?")
+    fusion = FusionRetriever(
+        retriever.indexer,
+        {
+            "tfidf": _DelayedRetriever(retriever.tfidf, 0.05),
+            "lexical": _DelayedRetriever(retriever.lexical, 0.05),
+            "broken": _FailingRetriever(),
+        },
+        timeouts={"tfidf": 1.0, "lexical": 1.0},
+        workers_per_retriever=2,
+    )
+    outcomes = []
+    threads = [
+        threading.Thread(target=lambda: outcomes.append(fusion.fuse(bundle, top_k=4)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(outcomes) == 8
+    for outcome in outcomes:
+        assert outcome.dropped == ["broken"]
+        assert len(outcome.results) == 4
+    fusion.close()
+
+
+def test_weighted_fusion_runs_through_pipeline():
+    retriever, processor = build_pipeline(str(DATA_PATH))
+    fusion = FusionRetriever.from_hybrid(
+        retriever, method="weighted", weights={"tfidf": 0.7, "lexical": 0.3}
+    )
+    artifacts = run_pipeline(
+        query="What is the compress-sense-expand idea in REFRAG?",
+        retriever=fusion,
+        processor=processor,
+    )
+    assert artifacts.chunks
+    fusion.close()
+
+
+def test_text_store_round_trips_and_serves_lazy_chunks(tmp_path):
+    with TextStoreWriter(tmp_path) as writer:
+        rows = [writer.append(text) for text in ("alpha", "", "héllo wörld")]
+    store = TextStore(tmp_path)
+    assert [store.get(row) for row in rows] == ["alpha", "", "héllo wörld"]
+    with pytest.raises(FileExistsError):
+        TextStoreWriter(tmp_path)
+    store.close()
+
+    retriever, processor = build_pipeline(str(DATA_PATH), text_store=str(tmp_path))
+    assert all(isinstance(chunk, StoredChunk) for chunk in retriever.indexer.chunks)
+    assert "text" not in vars(retriever.indexer.chunks[0])
+    artifacts = run_pipeline(
+        query="How does reranking improve the RAG pipeline?",
+        retriever=retriever,
+        processor=processor,
+    )
+    assert "rerank" in artifacts.answer_outline.lower()
+
+
+def test_deadline_degrades_stages_when_budget_is_exhausted():
+    retriever, processor = build_pipeline(str(DATA_PATH))
+    query = "How does reranking and retrieval improve the RAG pipeline?"
+    relaxed = run_pipeline(
+        query=query,
+        retriever=retriever,
+        processor=processor,
+        deadline=Deadline(budget_ms=60_000),
+    )
+    assert relaxed.degradations == []
+
+    exhausted = run_pipeline(
+        query=query,
+        retriever=retriever,
+        processor=processor,
+        deadline=Deadline(budget_ms=0),
+    )
+    assert exhausted.chunks
+    assert exhausted.refrag_summary
+    assert "rerank:skipped" in exhausted.degradations
+    assert any(item.startswith("rewrites:") for item in exhausted.degradations)
+    assert any(item.startswith("refrag_retain:") for item in exhausted.degradations)
+    assert "candidates:6->4" in exhausted.degradations
+
+
+def test_deadline_sizes_candidate_pool_from_stage_costs():
+    costs = StageCostModel(
+        costs={"retrieve": 1.0, "rerank": 0.5, "refrag": 0.2, "generate": 0.2}
+    )
+    # 5.25 ms - (1 rewrite + 4 chunks + generation) leaves ~3.25 ms: 6 candidates.
+    deadline = Deadline(budget_ms=5.25, costs=costs)
+    assert deadline.plan_pool(10, reduced=4, rewrites=1, chunks=4) == 6
+    assert deadline.degradations == ["candidates:10->6"]
+    relaxed = Deadline(budget_ms=1_000, costs=costs)
+    assert relaxed.plan_pool(10, reduced=4, rewrites=1, chunks=4) == 10
+    assert relaxed.degradations == []
+
+
+def test_stage_cost_model_tracks_per_unit_latency():
+    costs = StageCostModel(alpha=0.5, costs={})
+    costs.observe("rerank", elapsed_ms=8.0, units=4)
+    costs.observe("rerank", elapsed_ms=4.0, units=4)
+    assert costs.expected("rerank", units=2) == 3.0
+
+
+def test_index_manager_swaps_versions_without_blocking_readers():
+    released = []
+    manager = IndexManager(
+        lambda: build_pipeline(str(DATA_PATH)), on_release=released.append
+    )
+    first = manager.load()
+    gate = threading.Event()
+
+    def slow_builder():
+        gate.wait(timeout=5)
+        return build_pipeline(str(DATA_PATH))
+
+    with manager.acquire() as pinned:
+        future = manager.rebuild(slow_builder)
+        artifacts = manager.run("How does reranking improve the RAG pipeline?")
+        assert artifacts.index_version == first.version_id
+        gate.set()
+        second = future.result(timeout=10)
+        assert manager.version_id == second.version_id != first.version_id
+        assert pinned is first and not first.released
+    assert first.released
+    assert released == [first]
+    manager.close()
+
+
+def test_index_manager_rebuilds_text_stores_without_touching_live_versions(
+    tmp_path,
+):
+    released = []
+    manager = IndexManager(
+        lambda: build_pipeline(str(DATA_PATH), text_store=str(tmp_path)),
+        on_release=released.append,
+    )
+    first = manager.load()
+    old_store = first.retriever.indexer.text_store
+    expected = [chunk.text for chunk in first.retriever.indexer.chunks]
+    with manager.acquire() as pinned:
+        manager.load(
+            lambda: build_pipeline(
+                str(DATA_PATH),
+                text_store=str(tmp_path),
+                config=PipelineConfig(chunk_size=20, overlap=5),
+            )
+        )
+        assert [chunk.text for chunk in pinned.retriever.indexer.chunks] == expected
+    assert released == [first]
+    assert not old_store.directory.exists()
+    assert manager.run("What is reranking?").chunks
+    manager.current.retriever.close()
+    manager.close()
+
+
+def test_index_manager_loads_snapshots(tmp_path):
+    retriever, processor = build_pipeline(str(DATA_PATH))
+    path = tmp_path / "index.pkl"
+    save_snapshot(retriever, processor, path)
+    manager = IndexManager(snapshot_builder(path))
+    manager.load()
+    artifacts = manager.run("What is the compress-sense-expand idea in REFRAG?")
+    assert artifacts.chunks and artifacts.index_version == manager.version_id
+    manager.close()
+
+
+def test_index_manager_rebuilds_snapshots_in_a_process_pool(tmp_path):
+    retriever, processor = build_pipeline(str(DATA_PATH))
+    path = tmp_path / "index.pkl"
+    save_snapshot(retriever, processor, path)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        manager = IndexManager(snapshot_builder(path), executor=executor)
+        version = manager.rebuild().result(timeout=60)
+        assert manager.version_id == version.version_id
+        assert manager.run("What is reranking?").chunks
+        manager.close()
+
+
+def test_semantic_chunker_spans_cover_text_on_sentence_edges():
+    sentences = [f"Sentence {idx} talks about retrieval stages." for idx in range(12)]
+    document = Document(id="doc", title="Doc", content="  ".join(sentences))
+    chunker = SemanticChunker(chunk_size=14, overlap=4)
+    chunks = chunker.chunk(document)
+    assert all(isinstance(chunk, SpanChunk) for chunk in chunks)
+    assert all("text" not in vars(chunk) for chunk in chunks)
+    assert all(chunk.text.endswith(".") for chunk in chunks)
+    assert all(len(chunk.text.split()) <= 14 for chunk in chunks)
+    assert chunks[0].text.startswith("Sentence 0")
+    assert chunks[-1].text.endswith(sentences[-1])
+    for previous, current in zip(chunks, chunks[1:]):
+        # Consecutive windows overlap or abut; no tokens are skipped.
+        gap = document.content[previous.end : current.start]
+        assert current.start <= previous.end or not gap.strip()
+        assert current.text.startswith("Sentence")
+
+
+def test_token_offsets_match_str_split():
+    for text in (
+        "  Tabs\tand non-breaking\u3000spaces\nall split.  ",
+        "Retrieval 日本語テキスト works 😀 fine.\u3000検索拡張生成は強力です。",
+        "bad \ud800 surrogate \udfff text.",
+    ):
+        starts, ends = token_offsets(text)
+        assert [text[s:e] for s, e in zip(starts, ends)] == text.split()
+    document = Document(id="ja", title="JA", content="日本語の文書です。 検索 😀")
+    chunks = SemanticChunker().chunk(document)
+    assert [chunk.text for chunk in chunks] == [document.content]
+
+
+def test_chunk_documents_batches_match_per_document_chunks():
+    # Enough documents that the lockstep window planner runs before the tail.
+    documents = [
+        Document(id=f"{doc.id}-{copy}", title=doc.title, content=doc.content[copy:])
+        for copy in range(8)
+        for doc in load_documents(DATA_PATH)
+    ]
+    documents += [
+        Document(id="empty", title="Empty", content=""),
+        Document(id="blank", title="Blank", content="  \n "),
+        Document(id="odd", title="Odd", content="Lone \ud800 surrogate. Next one."),
+    ]
+    chunker = SemanticChunker(chunk_size=12, overlap=4)
+    batched = list(chunker.chunk_documents(documents))
+    single = [chunk for document in documents for chunk in chunker.chunk(document)]
+    assert [(c.chunk_id, c.text) for c in batched] == [
+        (c.chunk_id, c.text) for c in single
+    ]
+
+
+def test_pareto_front_keeps_only_non_dominated_trials():
+    def trial(name, coverage, latency):
+        return TrialResult(name, PipelineConfig(), coverage, latency, 3, 1)
+
+    results = [
+        trial("fast", 0.6, 1.0),
+        trial("accurate", 0.9, 5.0),
+        trial("dominated", 0.5, 6.0),
+        trial("balanced", 0.8, 2.0),
+    ]
+    assert [r.name for r in pareto_front(results)] == ["fast", "balanced", "accurate"]
+    assert choose(pareto_front(results), max_latency_ms=3.0).name == "balanced"
+
+
+def test_autotune_exports_configs_readable_by_sweep_clis(tmp_path):
+    space = {"top_k": [4, 6], "retain_ratio": [0.2, 0.4], "chunk_size": [40, 80]}
+    configs = sample_configs(space, samples=4, seed=1)
+    assert configs[0] == PipelineConfig()
+    samples = load_samples("data/eval_questions.json")
+    results = successive_halving(
+        configs, samples, PipelineCache(str(DATA_PATH)), eta=2, rungs=2
+    )
+    front = pareto_front(results)
+    path = tmp_path / "autotuned.yaml"
+    export_yaml(front, choose(front, None), [s.question for s in samples], path)
+    selectors, queries = load_refrag_config(path)
+    assert len(selectors) == len(front)
+    assert queries == [s.question for s in samples]